@@ -16,6 +16,29 @@ class Settings(BaseSettings):
     HANDWRITING_MODEL_PATH: str = "models/handwriting_model.pt"
     TEXT_MODEL_PATH: str = "models/text_model.pt"
     
+    # Exemplar gallery settings
+    EXEMPLAR_INDEX_PATH: str = "models/exemplar_index"
+    EXEMPLAR_MATCH_THRESHOLD: float = 0.8
+    EXEMPLAR_TOP_K: int = 5
+    
+    # Visual template library settings
+    TEMPLATE_INDEX_PATH: str = "models/templates.json"
+    TEMPLATE_MAX_DISTANCE: int = 12
+    
+    # Metrics settings
+    METRICS_ENABLED: bool = True
+    
+    # Admission control settings
+    ADMISSION_MEMORY_BUDGET_MB: int = 4096
+    # Peak memory per page as a multiple of its BGR buffer: while rasterizing,
+    # each page is held as a PIL RGB image and a numpy copy (2x); afterwards the
+    # BGR page and its grayscale copy remain (~1.33x). Check against the
+    # page_memory_factor reported by benchmarks.run
+    ADMISSION_PAGE_MEMORY_FACTOR: float = 2.0
+    ADMISSION_REQUEST_OVERHEAD_MB: int = 256
+    ADMISSION_MAX_QUEUE: int = 16
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    
     class Config:
         case_sensitive = True
 
@@ -1,7 +1,16 @@
+import json
+import logging
 from fastapi import FastAPI, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from .services.document_processor import DocumentProcessor
+from .services.admission import AdmissionController, AdmissionRejected
+from .services.metrics import metrics
 from .models.analysis import AnalysisResult
+from .config import settings
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Document Authenticity Analyzer API")
 
@@ -15,15 +24,62 @@ app.add_middleware(
 )
 
 document_processor = DocumentProcessor()
+admission_controller = AdmissionController(
+    budget_bytes=settings.ADMISSION_MEMORY_BUDGET_MB * 2 ** 20,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    page_memory_factor=settings.ADMISSION_PAGE_MEMORY_FACTOR,
+    request_overhead_bytes=settings.ADMISSION_REQUEST_OVERHEAD_MB * 2 ** 20
+)
 
 @app.post("/api/analyze", response_model=AnalysisResult)
-async def analyze_document(file: UploadFile):
+async def analyze_document(file: UploadFile, timings: bool = False):
     if not file.filename.endswith('.pdf'):
+        metrics.inc('requests_total', status='rejected')
         raise HTTPException(status_code=400, detail="Only PDF files are accepted")
     
+    content = await file.read()
+    
+    # Budget by page count and size before any page is rasterized; pdfinfo
+    # runs as a subprocess, so keep it off the event loop
     try:
-        content = await file.read()
-        result = await document_processor.analyze(content)
-        return result
+        page_count, page_bytes = await run_in_threadpool(
+            document_processor.file_converter.page_layout, content
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        metrics.inc('requests_total', status='rejected')
+        raise HTTPException(status_code=400, detail=str(e))
+    cost = admission_controller.estimate_cost(page_count, page_bytes)
+    
+    try:
+        async with admission_controller.admit(cost):
+            try:
+                with metrics.request_timings(enabled=timings) as breakdown:
+                    with metrics.stage('request'):
+                        result = await document_processor.analyze(content)
+                metrics.inc('requests_total', status='ok')
+                
+                # Opt-in per-request breakdown, attached to the response and logged as JSON
+                if timings:
+                    result.timings = breakdown
+                    logger.info(json.dumps({
+                        "event": "analyze_timings",
+                        "filename": file.filename,
+                        "bytes": len(content),
+                        "timings": breakdown
+                    }))
+                return result
+            except Exception as e:
+                metrics.inc('requests_total', status='error')
+                raise HTTPException(status_code=500, detail=str(e))
+    except AdmissionRejected as e:
+        metrics.inc('requests_total', status='shed')
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional
 
 class SegmentAnalysis(BaseModel):
     id: str
@@ -35,4 +35,5 @@ class AnalysisResult(BaseModel):
     visual_similarity: VisualSimilarity
     text_analysis: TextAnalysis
     handwriting_analysis: HandwritingAnalysis
-    overall_score: float
\ No newline at end of file
+    overall_score: float
+    timings: Optional[Dict[str, float]] = None
\ No newline at end of file
@@ -0,0 +1,148 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from .metrics import metrics
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server is at capacity ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Admits analysis requests against a memory budget.
+
+    Each request's cost is estimated from its page count times the memory a
+    rasterized page occupies through the pipeline, plus a fixed per-request
+    overhead for model activations. Requests run while the summed cost of
+    in-flight requests fits the budget; the rest wait in FIFO order until
+    capacity frees up or their deadline passes. When the queue is full, or the
+    deadline expires, the request is shed with a Retry-After hint derived from
+    recent request durations. A request whose cost exceeds the whole budget
+    runs exclusively: it waits its turn until nothing else is in flight.
+    """
+
+    def __init__(self, budget_bytes: int, max_queue: int, queue_timeout: float,
+                 page_memory_factor: float, request_overhead_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.page_memory_factor = page_memory_factor
+        self.request_overhead_bytes = request_overhead_bytes
+        self.inflight_bytes = 0
+        self.inflight_requests = 0
+        # Queued (cost, future) pairs; a future resolves once its capacity is reserved
+        self._waiters = deque()
+        # Exponentially weighted average of how long admitted requests hold capacity
+        self._avg_duration = 1.0
+
+    def estimate_cost(self, page_count: int, page_bytes: int) -> int:
+        """
+        Estimate the peak memory of analyzing a document.
+
+        Args:
+            page_count (int): Number of pages in the PDF
+            page_bytes (int): Size of one rasterized page buffer
+
+        Returns:
+            int: Estimated cost in bytes
+        """
+        return int(self.request_overhead_bytes + page_count * page_bytes * self.page_memory_factor)
+
+    def retry_after(self) -> int:
+        """Seconds until capacity is likely to free up for one more request."""
+        slots = max(self.inflight_requests, 1)
+        wait = self._avg_duration * (len(self._waiters) + 1) / slots
+        return int(min(max(math.ceil(wait), 1), 60))
+
+    @asynccontextmanager
+    async def admit(self, cost_bytes: int) -> AsyncIterator[None]:
+        """
+        Hold ``cost_bytes`` of the budget for the duration of the block.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait exceeds ``queue_timeout``
+        """
+        start = time.perf_counter()
+        if self._waiters or not self._fits(cost_bytes):
+            if len(self._waiters) >= self.max_queue:
+                self._reject('queue_full')
+
+            waiter = (cost_bytes, asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+            self._export()
+            try:
+                # Unlike wait_for, asyncio.wait never swallows a cancellation
+                # that races with the grant
+                await asyncio.wait([waiter[1]], timeout=self.queue_timeout)
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+            if not waiter[1].done():
+                self._abandon(waiter)
+                self._reject('timeout')
+        else:
+            self._reserve(cost_bytes)
+        metrics.observe('admission_queue_wait_seconds', time.perf_counter() - start)
+
+        admitted = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.perf_counter() - admitted)
+            self._release(cost_bytes)
+
+    def _fits(self, cost_bytes: int) -> bool:
+        # A request larger than the whole budget may still run, but only alone;
+        # holding its full cost keeps everything else queued behind it
+        return self.inflight_requests == 0 or self.inflight_bytes + cost_bytes <= self.budget_bytes
+
+    def _reserve(self, cost_bytes: int):
+        self.inflight_bytes += cost_bytes
+        self.inflight_requests += 1
+        self._export()
+
+    def _release(self, cost_bytes: int):
+        self.inflight_bytes -= cost_bytes
+        self.inflight_requests -= 1
+        self._grant()
+
+    def _grant(self):
+        # Admit from the head of the queue only, so large requests are not starved
+        while self._waiters and self._fits(self._waiters[0][0]):
+            cost_bytes, future = self._waiters.popleft()
+            self._reserve(cost_bytes)
+            future.set_result(None)
+        self._export()
+
+    def _abandon(self, waiter):
+        cost_bytes, future = waiter
+        if future.done():
+            # Capacity was reserved just before the waiter gave up; hand it on
+            self._release(cost_bytes)
+        else:
+            future.cancel()
+            self._waiters.remove(waiter)
+            # The head of the queue may have changed
+            self._grant()
+
+    def _reject(self, reason: str):
+        metrics.inc('admission_rejections_total', reason=reason)
+        raise AdmissionRejected(reason, self.retry_after())
+
+    def _export(self):
+        metrics.set_gauge('admission_inflight_cost_bytes', self.inflight_bytes)
+        metrics.set_gauge('admission_inflight_requests', self.inflight_requests)
+        metrics.set_gauge('admission_queue_depth', len(self._waiters))
+
+metrics.describe('admission_queue_wait_seconds', 'histogram', 'Time admitted requests waited for capacity')
+metrics.describe('admission_rejections_total', 'counter', 'Requests shed by admission control, by reason')
+metrics.describe('admission_inflight_cost_bytes', 'gauge', 'Estimated memory held by in-flight requests')
+metrics.describe('admission_inflight_requests', 'gauge', 'Requests currently being analyzed')
+metrics.describe('admission_queue_depth', 'gauge', 'Requests waiting for capacity')
@@ -3,6 +3,7 @@ from .visual_analyzer import VisualAnalyzer
 from .text_analyzer import TextAnalyzer
 from .handwriting_analyzer import HandwritingAnalyzer
 from .file_converter import FileConverter
+from .metrics import metrics
 import asyncio
 
 class DocumentProcessor:
@@ -13,27 +14,30 @@ class DocumentProcessor:
         self.handwriting_analyzer = HandwritingAnalyzer()
 
     async def analyze(self, pdf_content: bytes) -> AnalysisResult:
+        metrics.inc('bytes_processed_total', len(pdf_content))
+        
         # Convert PDF to images
-        images = await self.file_converter.pdf_to_images(pdf_content)
+        with metrics.stage('rasterize'):
+            images = await self.file_converter.pdf_to_images(pdf_content)
+        metrics.inc('pages_total', len(images))
         
-        # Process each image
+        # Preprocess each page for OCR. Layout regions are not extracted here
+        # since no analyzer consumes them; each analyzer segments the pages
+        # it needs itself
         processed_images = []
         for image in images:
-            # Preprocess the image
-            preprocessed = self.file_converter.preprocess_image(image)
-            # Extract regions
-            regions = self.file_converter.extract_regions(preprocessed)
-            processed_images.append((preprocessed, regions))
+            with metrics.stage('preprocess'):
+                processed_images.append(self.file_converter.preprocess_image(image))
 
-        # Run analyses concurrently
+        # Run analyses concurrently; pages are shared, not re-rasterized per analyzer
         visual_task = asyncio.create_task(
-            self.visual_analyzer.analyze(processed_images)
+            self.visual_analyzer.analyze(images)
         )
         text_task = asyncio.create_task(
             self.text_analyzer.analyze(processed_images)
         )
         handwriting_task = asyncio.create_task(
-            self.handwriting_analyzer.analyze(processed_images)
+            self.handwriting_analyzer.analyze(images)
         )
 
         # Wait for all analyses to complete
@@ -0,0 +1,367 @@
+import json
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+def _grow(buffer: np.ndarray, size: int) -> np.ndarray:
+    """Return ``buffer`` with room for ``size`` items, doubling its capacity when full."""
+    if size <= len(buffer):
+        return buffer
+    grown = np.zeros(max(size, 2 * len(buffer)), dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+def _append(path: Path, data: bytes, committed: int):
+    # Drop any tail left by an interrupted write before appending
+    with open(path, "ab") as f:
+        f.truncate(committed)
+        f.write(data)
+
+class ExemplarIndex:
+    """
+    Persistent gallery of enrolled handwriting embeddings with top-k cosine search.
+
+    Embeddings (the output of ``SiameseNetwork.forward_one``) are L2-normalised
+    and appended to a raw float32 file that is memory-mapped for search, so the
+    gallery never has to be fully loaded into RAM. Ids, labels and tombstones
+    live in append-only files next to the vectors, so adds and deletes only
+    write the rows they touch; ``compact`` rewrites the files without the
+    tombstoned rows. An optional IVF coarse quantizer restricts each query to
+    the closest ``nprobe`` clusters for large galleries.
+
+    On-disk layout of ``index_dir``:
+        meta.json        row count, committed file sizes and IVF settings
+        vectors.f32      row-major (count, dim) float32 embeddings
+        ids.i64          stable id of each row, ascending
+        labels.jsonl     label of each row, one JSON string per line
+        deleted.i64      row positions tombstoned since the last ``compact``
+        assignments.i32  IVF cluster of each row (only after ``build_ivf``)
+        centroids.npy    IVF cluster centroids (only after ``build_ivf``)
+
+    ``meta.json`` is written last and atomically, so rows appended by an
+    interrupted ``add`` or ``remove`` are ignored on load and overwritten by
+    the next write.
+    """
+
+    def __init__(self, index_dir: str, dim: int = 64):
+        self.index_dir = Path(index_dir)
+        self.dim = dim
+        self.labels: List[str] = []
+        self.nprobe = 8
+        self._count = 0
+        self._next_id = 0
+        self._labels_bytes = 0
+        self._deleted_count = 0
+        # Growable buffers; only the first ``_count`` entries are valid
+        self._ids_buffer = np.zeros(0, dtype=np.int64)
+        self._deleted_buffer = np.zeros(0, dtype=bool)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        # Inverted lists: a growable buffer of row positions per cluster
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+
+        if (self.index_dir / "meta.json").exists():
+            self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.index_dir / "vectors.f32"
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.index_dir / "ids.i64"
+
+    @property
+    def _labels_path(self) -> Path:
+        return self.index_dir / "labels.jsonl"
+
+    @property
+    def _deleted_path(self) -> Path:
+        return self.index_dir / "deleted.i64"
+
+    @property
+    def _assignments_path(self) -> Path:
+        return self.index_dir / "assignments.i32"
+
+    @property
+    def _centroids_path(self) -> Path:
+        return self.index_dir / "centroids.npy"
+
+    @property
+    def ids(self) -> List[int]:
+        """Stable id of every row, tombstones included."""
+        return self._ids_buffer[:self._count].tolist()
+
+    @property
+    def _deleted(self) -> np.ndarray:
+        return self._deleted_buffer[:self._count]
+
+    def __len__(self) -> int:
+        return int(self._count - self._deleted_count)
+
+    def add(self, embeddings: np.ndarray, labels: Sequence[str]) -> List[int]:
+        """
+        Enroll embeddings for the given signer/document-family labels.
+
+        Args:
+            embeddings (np.ndarray): (n, dim) array of ``forward_one`` outputs
+            labels (Sequence[str]): One label per embedding
+
+        Returns:
+            List[int]: Stable ids assigned to the new rows
+        """
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim))
+        if len(vectors) != len(labels):
+            raise ValueError("Number of embeddings and labels must match")
+
+        start, n = self._count, len(vectors)
+        new_ids = np.arange(self._next_id, self._next_id + n, dtype=np.int64)
+        encoded = "".join(json.dumps(label) + "\n" for label in labels).encode()
+
+        # Append only the new rows to each file
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        _append(self._vectors_path, vectors.tobytes(), start * self.dim * 4)
+        _append(self._ids_path, new_ids.tobytes(), start * 8)
+        _append(self._labels_path, encoded, self._labels_bytes)
+
+        assignments = None
+        if self._centroids is not None:
+            assignments = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+            _append(self._assignments_path, assignments.tobytes(), start * 4)
+
+        self._count += n
+        self._next_id += n
+        self._labels_bytes += len(encoded)
+        self.labels.extend(labels)
+        self._ids_buffer = _grow(self._ids_buffer, self._count)
+        self._ids_buffer[start:self._count] = new_ids
+        self._deleted_buffer = _grow(self._deleted_buffer, self._count)
+        self._deleted_buffer[start:self._count] = False
+
+        self._save_meta()
+        self._map()
+        if assignments is not None:
+            self._add_to_lists(np.arange(start, self._count, dtype=np.int64), assignments)
+        return new_ids.tolist()
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """
+        Tombstone rows by id. Space is reclaimed by ``compact``.
+
+        Returns:
+            int: Number of rows removed
+        """
+        ids = np.unique(np.fromiter(ids, dtype=np.int64))
+        # Ids are assigned in ascending order, so rows are found by binary search
+        stored = self._ids_buffer[:self._count]
+        positions = np.searchsorted(stored, ids)
+        inside = positions < self._count
+        positions = positions[inside][stored[positions[inside]] == ids[inside]]
+        positions = positions[~self._deleted[positions]]
+        if len(positions) == 0:
+            return 0
+
+        _append(self._deleted_path, positions.astype(np.int64).tobytes(), self._deleted_count * 8)
+        self._deleted_buffer[positions] = True
+        self._deleted_count += len(positions)
+        self._save_meta()
+        return len(positions)
+
+    def remove_label(self, label: str) -> int:
+        """Tombstone every exemplar enrolled under ``label``."""
+        stored = self._ids_buffer[:self._count]
+        return self.remove(stored[i] for i, l in enumerate(self.labels) if l == label)
+
+    def compact(self):
+        """Rewrite the gallery files without tombstoned rows."""
+        keep = ~self._deleted
+        vectors = np.ascontiguousarray(self._vectors[keep])
+        ids = self._ids_buffer[:self._count][keep]
+        assignments = np.ascontiguousarray(self._assignments[keep]) if self._centroids is not None else None
+        self.labels = [l for l, k in zip(self.labels, keep) if k]
+        encoded = "".join(json.dumps(label) + "\n" for label in self.labels).encode()
+
+        # Drop the memory maps before overwriting the files they point at
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._assignments = np.zeros(0, dtype=np.int32)
+        vectors.tofile(self._vectors_path)
+        ids.tofile(self._ids_path)
+        self._labels_path.write_bytes(encoded)
+        self._deleted_path.write_bytes(b"")
+        if assignments is not None:
+            assignments.tofile(self._assignments_path)
+
+        self._count = len(ids)
+        self._labels_bytes = len(encoded)
+        self._deleted_count = 0
+        self._ids_buffer = ids.copy()
+        self._deleted_buffer = np.zeros(self._count, dtype=bool)
+
+        self._save_meta()
+        self._map()
+        self._build_lists()
+
+    def build_ivf(self, n_lists: int = 64, iterations: int = 10, nprobe: int = 8, seed: int = 0):
+        """
+        Build an IVF coarse quantizer over the live rows with spherical k-means.
+
+        Args:
+            n_lists (int): Number of clusters
+            iterations (int): k-means iterations
+            nprobe (int): Clusters scanned per query
+            seed (int): Random seed for centroid initialisation
+        """
+        live = np.flatnonzero(~self._deleted)
+        if len(live) == 0:
+            raise ValueError("Cannot build IVF on an empty index")
+
+        n_lists = min(n_lists, len(live))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(self._vectors[live])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignments == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        self._centroids = centroids.astype(np.float32)
+        self.nprobe = nprobe
+        np.save(self._centroids_path, self._centroids)
+
+        # Assign every row, tombstones included, so positions stay aligned
+        assignments = np.argmax(np.asarray(self._vectors) @ self._centroids.T, axis=1).astype(np.int32)
+        self._assignments = np.zeros(0, dtype=np.int32)
+        assignments.tofile(self._assignments_path)
+
+        self._save_meta()
+        self._map()
+        self._build_lists()
+
+    def search(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar enrolled exemplars for each query.
+
+        Args:
+            queries (np.ndarray): (m, dim) array of query embeddings
+            k (int): Number of neighbours per query
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (m, k) cosine similarities, sorted
+            descending, and (m, k) row positions; missing neighbours are
+            padded with -inf and -1
+        """
+        queries = self._normalize(np.asarray(queries, dtype=np.float32).reshape(-1, self.dim))
+        m = len(queries)
+        scores = np.full((m, k), -np.inf, dtype=np.float32)
+        rows = np.full((m, k), -1, dtype=np.int64)
+
+        if len(self) == 0 or m == 0:
+            return scores, rows
+
+        if self._centroids is None:
+            candidates = np.flatnonzero(~self._deleted)
+            self._topk(queries, candidates, k, scores, rows)
+        else:
+            probes = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :self.nprobe]
+            for qi in range(m):
+                # Gather rows from the probed inverted lists only
+                candidates = np.concatenate([self._lists[c][:self._list_sizes[c]] for c in probes[qi]])
+                candidates = candidates[~self._deleted[candidates]]
+                self._topk(queries[qi:qi + 1], candidates, k, scores[qi:qi + 1], rows[qi:qi + 1])
+
+        return scores, rows
+
+    def label_of(self, row: int) -> Optional[str]:
+        """Return the label of a row position returned by ``search``."""
+        return self.labels[row] if row >= 0 else None
+
+    def _topk(self, queries, candidates, k, scores_out, rows_out):
+        if len(candidates) == 0:
+            return
+        # A single matrix product scores every query against every candidate
+        sims = queries @ self._vectors[candidates].T
+        kk = min(k, len(candidates))
+        part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        scores_out[:, :kk] = np.take_along_axis(part_scores, order, axis=1)
+        rows_out[:, :kk] = candidates[np.take_along_axis(part, order, axis=1)]
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _map(self):
+        count = self._count
+        if count == 0 or not self._vectors_path.exists():
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        else:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+
+        if self._centroids is not None and count and self._assignments_path.exists():
+            self._assignments = np.memmap(self._assignments_path, dtype=np.int32, mode="r", shape=(count,))
+        else:
+            self._assignments = np.zeros(0, dtype=np.int32)
+
+    def _build_lists(self):
+        n_lists = 0 if self._centroids is None else len(self._centroids)
+        self._lists = [np.zeros(0, dtype=np.int64) for _ in range(n_lists)]
+        self._list_sizes = np.zeros(n_lists, dtype=np.int64)
+        if n_lists and len(self._assignments):
+            self._add_to_lists(np.arange(self._count, dtype=np.int64), np.asarray(self._assignments))
+
+    def _add_to_lists(self, rows: np.ndarray, assignments: np.ndarray):
+        # Group the rows by cluster, then append each group to its list
+        order = np.argsort(assignments, kind="stable")
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        for c, group in zip(clusters, np.split(rows[order], starts[1:])):
+            size = self._list_sizes[c]
+            self._lists[c] = _grow(self._lists[c], size + len(group))
+            self._lists[c][size:size + len(group)] = group
+            self._list_sizes[c] += len(group)
+
+    def _load(self):
+        with open(self.index_dir / "meta.json") as f:
+            meta = json.load(f)
+
+        self.dim = meta["dim"]
+        self.nprobe = meta.get("nprobe", self.nprobe)
+        self._count = meta["count"]
+        self._next_id = meta["next_id"]
+        self._labels_bytes = meta["labels_bytes"]
+        self._deleted_count = meta["deleted_count"]
+
+        # Read only the committed part of each append-only file
+        self._ids_buffer = np.fromfile(self._ids_path, dtype=np.int64, count=self._count)
+        with open(self._labels_path, "rb") as f:
+            self.labels = [json.loads(line) for line in f.read(self._labels_bytes).splitlines()]
+        self._deleted_buffer = np.zeros(self._count, dtype=bool)
+        if self._deleted_count:
+            self._deleted_buffer[np.fromfile(self._deleted_path, dtype=np.int64, count=self._deleted_count)] = True
+
+        if meta.get("ivf") and self._centroids_path.exists():
+            self._centroids = np.load(self._centroids_path)
+        self._map()
+        self._build_lists()
+
+    def _save_meta(self):
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "dim": self.dim,
+            "count": self._count,
+            "next_id": self._next_id,
+            "labels_bytes": self._labels_bytes,
+            "deleted_count": self._deleted_count,
+            "ivf": self._centroids is not None,
+            "nprobe": self.nprobe,
+        }
+        tmp_path = self.index_dir / "meta.json.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        tmp_path.replace(self.index_dir / "meta.json")
@@ -1,15 +1,54 @@
 import os
-from pdf2image import convert_from_bytes
+import re
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
 import cv2
 import numpy as np
 from typing import List, Tuple
 from PIL import Image
+from .region_table import RegionTable, REGION_CODES
+
+# pdfinfo page size values, e.g. "612 x 792 pts (letter)"
+PAGE_SIZE = re.compile(r"([\d.]+) x ([\d.]+) pts")
+POINTS_PER_INCH = 72
+# Upper bound of the page range passed to pdfinfo; it clamps to the real page count
+MAX_INFO_PAGES = 1000000
+
+# US Letter, assumed only if pdfinfo reports no page sizes
+PAGE_WIDTH_INCHES = 8.5
+PAGE_HEIGHT_INCHES = 11
 
 class FileConverter:
     def __init__(self):
         self.dpi = 300  # High resolution for better analysis
         self.output_format = 'PNG'
 
+    def page_layout(self, pdf_content: bytes) -> Tuple[int, int]:
+        """
+        Read the page count and page sizes with pdfinfo, without rasterizing.
+        
+        Args:
+            pdf_content (bytes): Raw PDF file content
+            
+        Returns:
+            Tuple[int, int]: Number of pages, and the size in bytes of the
+            largest page's rasterized BGR buffer at the configured DPI
+        """
+        try:
+            # A page range makes pdfinfo report the size of every page, not just the first
+            info = pdfinfo_from_bytes(pdf_content, first_page=1, last_page=MAX_INFO_PAGES)
+            page_count = int(info["Pages"])
+        except Exception as e:
+            raise Exception(f"Error reading PDF page layout: {str(e)}")
+        
+        sizes = [
+            PAGE_SIZE.match(value)
+            for key, value in info.items()
+            if key.startswith("Page") and key.endswith("size")
+        ]
+        areas = [float(m.group(1)) * float(m.group(2)) / POINTS_PER_INCH ** 2 for m in sizes if m]
+        area = max(areas, default=PAGE_WIDTH_INCHES * PAGE_HEIGHT_INCHES)
+        return page_count, int(area * self.dpi ** 2) * 3
+
     async def pdf_to_images(self, pdf_content: bytes) -> List[np.ndarray]:
         """
         Convert PDF content to a list of OpenCV images.
@@ -33,8 +72,8 @@ class FileConverter:
             for pil_image in pil_images:
                 # Convert PIL image to numpy array
                 numpy_image = np.array(pil_image)
-                # Convert RGB to BGR for OpenCV
-                cv_image = cv2.cvtColor(numpy_image, cv2.COLOR_RGB2BGR)
+                # Convert RGB to BGR for OpenCV in place, avoiding a second page copy
+                cv_image = cv2.cvtColor(numpy_image, cv2.COLOR_RGB2BGR, dst=numpy_image)
                 cv_images.append(cv_image)
             
             return cv_images
@@ -68,15 +107,17 @@ class FileConverter:
         except Exception as e:
             raise Exception(f"Error preprocessing image: {str(e)}")
 
-    def extract_regions(self, image: np.ndarray) -> List[Tuple[np.ndarray, str]]:
+    def extract_regions(self, image: np.ndarray, page_index: int = 0) -> RegionTable:
         """
         Extract different regions from the image.
         
         Args:
             image (np.ndarray): Input image
+            page_index (int): Index of the page the image belongs to
             
         Returns:
-            List[Tuple[np.ndarray, str]]: List of (region_image, region_type) tuples
+            RegionTable: Bounding boxes, areas and type codes of the regions;
+            crops are taken lazily as views with ``RegionTable.crop``
         """
         try:
             # Convert to binary
@@ -94,44 +135,52 @@ class FileConverter:
                 cv2.CHAIN_APPROX_SIMPLE
             )
             
-            regions = []
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area > 1000:  # Minimum area threshold
-                    x, y, w, h = cv2.boundingRect(contour)
-                    region = image[y:y+h, x:x+w]
-                    
-                    # Determine region type based on characteristics
-                    region_type = self._classify_region(region)
-                    
-                    regions.append((region, region_type))
+            if not contours:
+                return RegionTable()
+            
+            areas = np.array([cv2.contourArea(contour) for contour in contours], dtype=np.float32)
+            keep = np.flatnonzero(areas > 1000)  # Minimum area threshold
+            boxes = np.array([cv2.boundingRect(contours[i]) for i in keep], dtype=np.int32)
+            
+            regions = RegionTable.from_boxes(page_index, boxes, area=areas[keep])
+            
+            # Determine region types based on characteristics
+            regions.type_code = self._classify_regions(image, regions)
             
             return regions
             
         except Exception as e:
             raise Exception(f"Error extracting regions: {str(e)}")
 
-    def _classify_region(self, region: np.ndarray) -> str:
+    def _classify_regions(self, image: np.ndarray, regions: RegionTable) -> np.ndarray:
         """
-        Classify the type of region based on image characteristics.
+        Classify the type of every region based on image characteristics.
         
         Args:
-            region (np.ndarray): Region image
+            image (np.ndarray): Page image the regions were extracted from
+            regions (RegionTable): Regions on that page
             
         Returns:
-            str: Region type ('text', 'signature', or 'other')
+            np.ndarray: Region type codes ('text', 'signature', or 'other')
         """
         # Calculate region characteristics
-        height, width = region.shape
+        width = regions.w.astype(np.float64)
+        height = regions.h.astype(np.float64)
         aspect_ratio = width / height
         
-        # Calculate pixel density
-        pixel_density = np.sum(region > 0) / (width * height)
+        # Calculate pixel density for all regions at once from a summed-area table
+        integral = cv2.integral((image > 0).astype(np.uint8))
+        x0, y0 = regions.x, regions.y
+        x1, y1 = x0 + regions.w, y0 + regions.h
+        filled = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        pixel_density = filled / (width * height)
         
         # Simple classification rules
-        if aspect_ratio > 3:  # Long horizontal regions likely text
-            return 'text'
-        elif 0.5 < aspect_ratio < 2 and pixel_density < 0.2:  # Sparse content might be signature
-            return 'signature'
-        else:
-            return 'other'
\ No newline at end of file
+        return np.select(
+            [
+                aspect_ratio > 3,  # Long horizontal regions likely text
+                (0.5 < aspect_ratio) & (aspect_ratio < 2) & (pixel_density < 0.2)  # Sparse content might be signature
+            ],
+            [REGION_CODES['text'], REGION_CODES['signature']],
+            default=REGION_CODES['other']
+        ).astype(np.uint8)
@@ -1,63 +1,83 @@
 import cv2
 import numpy as np
 import torch
+from typing import List
 from torch.utils.data import DataLoader
-from torchvision import transforms
-from pdf2image import convert_from_bytes
-from PIL import Image
 from ..models.neural_network import SiameseNetwork
 from ..models.analysis import HandwritingAnalysis, HandwritingAnomaly
 from ..config import settings
+from .exemplar_index import ExemplarIndex
+from .region_table import RegionTable
+from .metrics import metrics
 
 class HandwritingAnalyzer:
+    INPUT_SIZE = 224
+    BATCH_SIZE = 64
+
     def __init__(self):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.model = SiameseNetwork().to(self.device)
         self.model.load_state_dict(torch.load(settings.HANDWRITING_MODEL_PATH))
         self.model.eval()
         
-        self.transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=[0.485, 0.456, 0.406],
-                std=[0.229, 0.224, 0.225]
-            )
-        ])
+        # ImageNet normalisation, applied to whole NCHW batches
+        self.mean = torch.tensor([0.485, 0.456, 0.406], device=self.device).view(1, 3, 1, 1) * 255
+        self.std = torch.tensor([0.229, 0.224, 0.225], device=self.device).view(1, 3, 1, 1) * 255
+        
+        # Model input buffers, allocated once and reused for every batch
+        self._staging = np.empty(
+            (self.BATCH_SIZE, self.INPUT_SIZE, self.INPUT_SIZE, 3), dtype=np.uint8
+        )
+        self._input = torch.empty(
+            (self.BATCH_SIZE, 3, self.INPUT_SIZE, self.INPUT_SIZE), device=self.device
+        )
+        
+        self.exemplar_index = ExemplarIndex(settings.EXEMPLAR_INDEX_PATH)
 
-    async def analyze(self, pdf_content: bytes) -> HandwritingAnalysis:
-        images = convert_from_bytes(pdf_content)
+    async def analyze(self, pages: List[np.ndarray]) -> HandwritingAnalysis:
         anomalies = []
         total_confidence = 0
         
-        with torch.no_grad():
-            for idx, image in enumerate(images):
-                # Convert PIL image to OpenCV format for region detection
-                img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        # Detect handwriting regions on every page into a single table
+        with metrics.stage('handwriting_detection'):
+            regions = RegionTable.concatenate([
+                self._detect_handwriting_regions(page, idx)
+                for idx, page in enumerate(pages)
+            ])
+        metrics.inc('regions_total', len(regions), source='handwriting')
+        
+        if len(regions):
+            # Embed all regions in batches straight from the page buffers
+            features = self._embed(regions, pages)
+            # Copy to the host once; per-region analysis works on row views
+            features_np = features.cpu().numpy()
+            
+            # Compare all regions against the authentic exemplars in one query
+            with metrics.stage('exemplar_search'):
+                match_scores, match_rows = self.exemplar_index.search(
+                    features_np,
+                    k=settings.EXEMPLAR_TOP_K
+                )
+            
+            # Analyze each region
+            ordinals = regions.page_ordinal()
+            for i in range(len(regions)):
+                location = f"page {regions.page[i] + 1}, region {ordinals[i] + 1}"
                 
-                # Detect handwriting regions
-                regions = self._detect_handwriting_regions(img_cv)
+                # Analyze features for anomalies
+                detected_anomalies = self._analyze_features(
+                    features_np[i:i + 1],
+                    location
+                )
+                detected_anomalies.extend(self._match_exemplars(
+                    match_scores[i],
+                    match_rows[i],
+                    location
+                ))
                 
-                # Analyze each region
-                for region_idx, region in enumerate(regions):
-                    # Convert region to PIL Image
-                    region_pil = Image.fromarray(cv2.cvtColor(region, cv2.COLOR_BGR2RGB))
-                    
-                    # Transform for model input
-                    region_tensor = self.transform(region_pil).unsqueeze(0).to(self.device)
-                    
-                    # Get feature embeddings
-                    features = self.model.forward_one(region_tensor)
-                    
-                    # Analyze features for anomalies
-                    detected_anomalies = self._analyze_features(
-                        features,
-                        f"page {idx + 1}, region {region_idx + 1}"
-                    )
-                    
-                    anomalies.extend(detected_anomalies)
-                    for anomaly in detected_anomalies:
-                        total_confidence += anomaly.confidence
+                anomalies.extend(detected_anomalies)
+                for anomaly in detected_anomalies:
+                    total_confidence += anomaly.confidence
 
         # Calculate overall score
         score = self._calculate_score(anomalies)
@@ -67,7 +87,60 @@ class HandwritingAnalyzer:
             anomalies=anomalies
         )
 
-    def _detect_handwriting_regions(self, image):
+    def enroll_exemplars(self, label: str, images: List[np.ndarray]) -> List[int]:
+        """
+        Enroll authentic handwriting samples for a signer or document family.
+        
+        Args:
+            label (str): Signer or document family the samples belong to
+            images (List[np.ndarray]): Sample crops in OpenCV (BGR) format
+            
+        Returns:
+            List[int]: Ids of the enrolled exemplars
+        """
+        # Treat each sample as a page holding a single full-size region
+        regions = RegionTable.concatenate([
+            RegionTable.from_boxes(idx, [(0, 0, image.shape[1], image.shape[0])])
+            for idx, image in enumerate(images)
+        ])
+        features = self._embed(regions, images)
+        return self.exemplar_index.add(features.cpu().numpy(), [label] * len(images))
+
+    def _embed(self, regions: RegionTable, pages: List[np.ndarray]) -> torch.Tensor:
+        features = []
+        with torch.no_grad():
+            for start in range(0, len(regions), self.BATCH_SIZE):
+                stop = min(start + self.BATCH_SIZE, len(regions))
+                with metrics.stage('handwriting_preparation'):
+                    batch = self._regions_to_tensor(regions, pages, start, stop)
+                with metrics.stage('handwriting_inference'):
+                    features.append(self.model.forward_one(batch))
+                metrics.observe('model_batch_size', stop - start)
+        return torch.cat(features)
+
+    def _regions_to_tensor(self, regions: RegionTable, pages: List[np.ndarray], start: int, stop: int) -> torch.Tensor:
+        count = stop - start
+        staging = self._staging[:count]
+        
+        # Resize each crop view directly into the uint8 staging buffer
+        for i in range(count):
+            cv2.resize(
+                regions.crop(start + i, pages),
+                (self.INPUT_SIZE, self.INPUT_SIZE),
+                dst=staging[i],
+                # Bilinear, matching the transforms.Resize used in training and evaluation
+                interpolation=cv2.INTER_LINEAR
+            )
+        
+        # Convert the whole batch at once: NHWC BGR uint8 -> NCHW RGB float
+        source = torch.from_numpy(staging).to(self.device)
+        batch = self._input[:count]
+        for channel in range(3):
+            batch[:, channel].copy_(source[..., 2 - channel])
+        
+        return batch.sub_(self.mean).div_(self.std)
+
+    def _detect_handwriting_regions(self, image, page_index=0):
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
@@ -82,21 +155,17 @@ class HandwritingAnalyzer:
             binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
         )
         
-        # Filter and extract regions
-        regions = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 1000:  # Minimum area threshold
-                x, y, w, h = cv2.boundingRect(contour)
-                region = image[y:y+h, x:x+w]
-                regions.append(region)
+        if not contours:
+            return RegionTable()
         
-        return regions
-
-    def _analyze_features(self, features, location):
-        # Convert features to numpy for analysis
-        features_np = features.cpu().numpy()
+        # Filter regions by area, keeping only their bounding boxes
+        areas = np.array([cv2.contourArea(contour) for contour in contours], dtype=np.float32)
+        keep = np.flatnonzero(areas > 1000)  # Minimum area threshold
+        boxes = np.array([cv2.boundingRect(contours[i]) for i in keep], dtype=np.int32)
         
+        return RegionTable.from_boxes(page_index, boxes, area=areas[keep])
+
+    def _analyze_features(self, features_np, location):
         # Define thresholds for different types of anomalies
         style_threshold = 0.8
         pressure_threshold = 0.7
@@ -133,11 +202,32 @@ class HandwritingAnalyzer:
         
         return anomalies
 
+    def _match_exemplars(self, scores, rows, location):
+        # Nothing to compare against until exemplars have been enrolled
+        if rows[0] < 0:
+            return []
+        
+        best_score = float(scores[0])
+        if best_score >= settings.EXEMPLAR_MATCH_THRESHOLD:
+            return []
+        
+        best_label = self.exemplar_index.label_of(int(rows[0]))
+        return [HandwritingAnomaly(
+            location=location,
+            type="style",
+            confidence=float(np.clip(1 - best_score, 0, 1)),
+            description=(
+                f"Handwriting does not match enrolled exemplars "
+                f"(closest: {best_label}, similarity {best_score:.2f})"
+            )
+        )]
+
     def _calculate_score(self, anomalies):
         if not anomalies:
             return 1.0
             
-        # Calculate weighted score based on anomaly confidences and types
+        # Weighted mean of anomaly confidences; the more certain the
+        # anomalies, the lower the score
         total_weight = 0
         weighted_sum = 0
         
@@ -150,6 +240,6 @@ class HandwritingAnalyzer:
         for anomaly in anomalies:
             weight = type_weights[anomaly.type]
             total_weight += weight
-            weighted_sum += (1 - anomaly.confidence) * weight
+            weighted_sum += anomaly.confidence * weight
             
         return 1.0 - (weighted_sum / total_weight)
\ No newline at end of file
@@ -0,0 +1,154 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+from ..config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-request stage breakdown, only set while a caller has opted in
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('request_timings', default=None)
+
+class Metrics:
+    """
+    In-process registry of counters, gauges and histograms rendered in the
+    Prometheus text exposition format.
+
+    When disabled every recording call returns immediately, so instrumented
+    code pays only for a method call and an attribute check.
+    """
+
+    def __init__(self, enabled: bool = True, prefix: str = 'docanalyzer'):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str, Sequence[float]]] = {}
+        self._values: Dict[str, Dict[Tuple[Tuple[str, str], ...], object]] = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Register a metric so it is exported with HELP/TYPE lines even before it is recorded."""
+        self._meta[name] = (metric_type, help_text, tuple(buckets))
+        self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values.setdefault(name, {})[self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        buckets = self._meta.get(name, ('histogram', '', DEFAULT_BUCKETS))[2]
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                state = series[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            state[0][bisect_left(buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a pipeline stage into ``stage_duration_seconds`` and, if the
+        current request opted in, into its timing breakdown.
+        """
+        timings = _request_timings.get()
+        if not self.enabled and timings is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe('stage_duration_seconds', elapsed, stage=name)
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def request_timings(self, enabled: bool = True) -> Iterator[Dict[str, float]]:
+        """
+        Collect a per-stage breakdown (seconds) for the enclosed request.
+
+        The yielded dict is filled in as stages complete; it stays empty when
+        ``enabled`` is False.
+        """
+        timings: Dict[str, float] = {}
+        if not enabled:
+            yield timings
+            return
+
+        token = _request_timings.set(timings)
+        try:
+            yield timings
+        finally:
+            _request_timings.reset(token)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._values):
+                metric_type, help_text, buckets = self._meta.get(name, ('untyped', '', DEFAULT_BUCKETS))
+                full_name = f"{self.prefix}_{name}"
+                if help_text:
+                    lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+
+                for key, value in sorted(self._values[name].items()):
+                    if metric_type == 'histogram':
+                        counts, total, count = value
+                        cumulative = 0
+                        for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                            cumulative += bucket_count
+                            le = bound if bound == '+Inf' else _format_value(bound)
+                            lines.append(f"{full_name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+                        lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(total)}")
+                        lines.append(f"{full_name}_count{_format_labels(key)} {count}")
+                    else:
+                        lines.append(f"{full_name}{_format_labels(key)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ''
+    escaped = (
+        (k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in key
+    )
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
+
+metrics.describe('stage_duration_seconds', 'histogram', 'Time spent in each analysis pipeline stage')
+metrics.describe('requests_total', 'counter', 'Analyze requests by outcome')
+metrics.describe('pages_total', 'counter', 'Pages rasterized')
+metrics.describe('regions_total', 'counter', 'Regions extracted, by source')
+metrics.describe('bytes_processed_total', 'counter', 'PDF bytes received for analysis')
+metrics.describe(
+    'model_batch_size', 'histogram', 'Number of regions per handwriting model forward pass',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
@@ -0,0 +1,90 @@
+from typing import Iterator, List, Sequence
+import numpy as np
+
+# Region type codes stored in ``RegionTable.type_code``
+REGION_TYPES = ('text', 'signature', 'other', 'header', 'body')
+REGION_CODES = {name: code for code, name in enumerate(REGION_TYPES)}
+
+class RegionTable:
+    """
+    Struct-of-arrays table of rectangular regions across the pages of a document.
+
+    Each column is a flat NumPy array with one entry per region, so a dense page
+    costs a handful of arrays instead of one Python object and one pixel copy
+    per region. Pixels are only touched through ``crop``, which returns a view
+    into the page buffer.
+    """
+
+    def __init__(self, page=None, x=None, y=None, w=None, h=None, type_code=None, area=None):
+        self.page = np.asarray(page if page is not None else [], dtype=np.int32)
+        self.x = np.asarray(x if x is not None else [], dtype=np.int32)
+        self.y = np.asarray(y if y is not None else [], dtype=np.int32)
+        self.w = np.asarray(w if w is not None else [], dtype=np.int32)
+        self.h = np.asarray(h if h is not None else [], dtype=np.int32)
+        self.type_code = np.asarray(
+            type_code if type_code is not None else np.full(len(self.page), REGION_CODES['other']),
+            dtype=np.uint8
+        )
+        self.area = np.asarray(
+            area if area is not None else self.w.astype(np.float32) * self.h,
+            dtype=np.float32
+        )
+
+    @classmethod
+    def from_boxes(cls, page_index: int, boxes: np.ndarray, type_code=None, area=None) -> 'RegionTable':
+        """
+        Build a table for one page from an (n, 4) array of ``(x, y, w, h)`` boxes.
+        """
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        return cls(
+            page=np.full(len(boxes), page_index, dtype=np.int32),
+            x=boxes[:, 0],
+            y=boxes[:, 1],
+            w=boxes[:, 2],
+            h=boxes[:, 3],
+            type_code=type_code,
+            area=area
+        )
+
+    @classmethod
+    def concatenate(cls, tables: Sequence['RegionTable']) -> 'RegionTable':
+        """Stack per-page tables into a single document table."""
+        if not tables:
+            return cls()
+        return cls(**{
+            column: np.concatenate([getattr(table, column) for table in tables])
+            for column in ('page', 'x', 'y', 'w', 'h', 'type_code', 'area')
+        })
+
+    def __len__(self) -> int:
+        return len(self.page)
+
+    def select(self, mask) -> 'RegionTable':
+        """Return the rows selected by a boolean mask or index array."""
+        return RegionTable(
+            page=self.page[mask],
+            x=self.x[mask],
+            y=self.y[mask],
+            w=self.w[mask],
+            h=self.h[mask],
+            type_code=self.type_code[mask],
+            area=self.area[mask]
+        )
+
+    def region_type(self, i: int) -> str:
+        return REGION_TYPES[self.type_code[i]]
+
+    def page_ordinal(self) -> np.ndarray:
+        """Position of each region within its own page (rows must be grouped by page)."""
+        first_row = np.searchsorted(self.page, self.page, side='left')
+        return np.arange(len(self), dtype=np.int32) - first_row
+
+    def crop(self, i: int, pages: List[np.ndarray]) -> np.ndarray:
+        """Return region ``i`` as a view into its page buffer (no copy)."""
+        x, y = self.x[i], self.y[i]
+        return pages[self.page[i]][y:y + self.h[i], x:x + self.w[i]]
+
+    def crops(self, pages: List[np.ndarray]) -> Iterator[np.ndarray]:
+        """Lazily yield a view for every region."""
+        for i in range(len(self)):
+            yield self.crop(i, pages)
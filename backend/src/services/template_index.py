@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+
+HASH_BITS = 64
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """
+    Compute a 64-bit DCT perceptual hash (pHash) of an image.
+
+    Args:
+        image (np.ndarray): Image in OpenCV format (grayscale or BGR)
+
+    Returns:
+        int: 64-bit hash
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Downscale before the DCT so the hash only sees coarse layout
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low_freq = cv2.dct(small)[:8, :8].flatten()
+
+    # Compare against the median of the AC coefficients, ignoring the DC term
+    bits = low_freq > np.median(low_freq[1:])
+    return int(np.packbits(bits).view('>u8')[0])
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under the Hamming metric."""
+
+    def __init__(self):
+        # Each node is (hash, payload, {distance: child})
+        self.root: Optional[Tuple[int, str, Dict[int, tuple]]] = None
+        self.size = 0
+
+    def add(self, hash_value: int, payload: str):
+        self.size += 1
+        if self.root is None:
+            self.root = (hash_value, payload, {})
+            return
+
+        node = self.root
+        while True:
+            distance = hamming_distance(hash_value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (hash_value, payload, {})
+                return
+            node = child
+
+    def nearest(self, hash_value: int) -> Optional[Tuple[int, str]]:
+        """
+        Find the closest stored hash.
+
+        Returns:
+            Optional[Tuple[int, str]]: (distance, payload), or None if the tree is empty
+        """
+        if self.root is None:
+            return None
+
+        best_distance, best_payload = HASH_BITS + 1, None
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(hash_value, node[0])
+            if distance < best_distance:
+                best_distance, best_payload = distance, node[1]
+                if distance == 0:
+                    break
+
+            # Triangle inequality: only children within the current best radius can improve
+            for edge, child in node[2].items():
+                if distance - best_distance < edge < distance + best_distance:
+                    stack.append(child)
+
+        return best_distance, best_payload
+
+class TemplateIndex:
+    """
+    Library of authentic layout templates, one BK-tree per region type.
+
+    Templates are persisted as a JSON list of ``{region, label, hash}`` records
+    and the trees are rebuilt on load.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = Path(index_path)
+        self.templates: List[dict] = []
+        self.trees: Dict[str, BKTree] = {}
+
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                for record in json.load(f):
+                    self._insert(record['region'], record['label'], int(record['hash'], 16))
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def add_template(self, image: np.ndarray, region_type: str, label: str) -> int:
+        """
+        Hash an authentic segment and add it to the library.
+
+        Args:
+            image (np.ndarray): Segment image in OpenCV format
+            region_type (str): Segment type ('header', 'body' or 'signature')
+            label (str): Name of the template the segment came from
+
+        Returns:
+            int: The segment's perceptual hash
+        """
+        hash_value = perceptual_hash(image)
+        self._insert(region_type, label, hash_value)
+        self.save()
+        return hash_value
+
+    def nearest(self, image: np.ndarray, region_type: str) -> Optional[Tuple[int, str]]:
+        """
+        Find the closest template of the same region type.
+
+        Returns:
+            Optional[Tuple[int, str]]: (Hamming distance, template label), or
+            None if no templates of this type are enrolled
+        """
+        tree = self.trees.get(region_type)
+        if tree is None:
+            return None
+        return tree.nearest(perceptual_hash(image))
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w') as f:
+            json.dump(self.templates, f)
+
+    def _insert(self, region_type: str, label: str, hash_value: int):
+        self.templates.append({
+            'region': region_type,
+            'label': label,
+            'hash': f"{hash_value:016x}"
+        })
+        self.trees.setdefault(region_type, BKTree()).add(hash_value, label)
@@ -1,24 +1,25 @@
 import pytesseract
-from pdf2image import convert_from_bytes
+import numpy as np
+from typing import List
 from transformers import pipeline
 from ..models.analysis import TextAnalysis, TextInconsistency
+from .metrics import metrics
 
 class TextAnalyzer:
     def __init__(self):
         self.nlp = pipeline("text-classification")
 
-    async def analyze(self, pdf_content: bytes) -> TextAnalysis:
-        # Convert PDF to images
-        images = convert_from_bytes(pdf_content)
-        
+    async def analyze(self, pages: List[np.ndarray]) -> TextAnalysis:
         # Extract text from all pages
         full_text = ""
-        for image in images:
-            text = pytesseract.image_to_string(image)
+        for page in pages:
+            with metrics.stage('ocr'):
+                text = pytesseract.image_to_string(page)
             full_text += text + "\n"
 
         # Analyze text consistency
-        inconsistencies = self._analyze_consistency(full_text)
+        with metrics.stage('text_consistency'):
+            inconsistencies = self._analyze_consistency(full_text)
         
         # Calculate overall score based on inconsistencies
         score = self._calculate_score(inconsistencies)
@@ -1,26 +1,38 @@
-import cv2
 import numpy as np
-from pdf2image import convert_from_bytes
+from typing import List
 from ..models.analysis import VisualSimilarity, SegmentAnalysis
+from ..config import settings
+from .template_index import TemplateIndex, HASH_BITS
+from .region_table import RegionTable, REGION_CODES
+from .metrics import metrics
 
 class VisualAnalyzer:
-    async def analyze(self, pdf_content: bytes) -> VisualSimilarity:
-        # Convert PDF to images
-        images = convert_from_bytes(pdf_content)
+    # Fraction of the page height taken by the header and signature bands
+    HEADER_FRACTION = 0.15
+    SIGNATURE_FRACTION = 0.2
+    
+    # Score reported when no template of a region type has been enrolled
+    DEFAULT_SIMILARITY = 0.85
+
+    def __init__(self):
+        self.template_index = TemplateIndex(settings.TEMPLATE_INDEX_PATH)
+
+    async def analyze(self, pages: List[np.ndarray]) -> VisualSimilarity:
         segments = []
         total_score = 0
 
-        for idx, image in enumerate(images):
-            # Convert PIL image to OpenCV format
-            img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
+        for idx, page in enumerate(pages):
             # Segment the image
-            regions = self._segment_image(img_cv)
+            regions = self._segment_image(page, idx)
             
             # Analyze each region
-            for region_idx, (region_img, region_type) in enumerate(regions):
-                similarity_score = self._analyze_region(region_img)
-                issues = self._detect_issues(region_img)
+            for region_idx in range(len(regions)):
+                region_img = regions.crop(region_idx, pages)
+                region_type = regions.region_type(region_idx)
+                with metrics.stage('template_match'):
+                    match = self.template_index.nearest(region_img, region_type)
+                similarity_score = self._analyze_region(match)
+                issues = self._detect_issues(match, region_type)
                 
                 segments.append(SegmentAnalysis(
                     id=f"page{idx+1}_region{region_idx+1}",
@@ -33,21 +45,55 @@ class VisualAnalyzer:
         avg_score = total_score / len(segments) if segments else 0
         return VisualSimilarity(score=avg_score, segments=segments)
 
-    def _segment_image(self, image):
-        # Implement image segmentation logic
-        # This is a placeholder implementation
-        return [
-            (image, "header"),
-            (image, "body"),
-            (image, "signature")
-        ]
-
-    def _analyze_region(self, region_img):
-        # Implement region analysis logic
-        # This is a placeholder implementation
-        return 0.85
-
-    def _detect_issues(self, region_img):
-        # Implement issue detection logic
-        # This is a placeholder implementation
-        return []
\ No newline at end of file
+    def enroll_template(self, image: np.ndarray, label: str):
+        """
+        Add the header, body and signature segments of an authentic page to
+        the template library.
+        
+        Args:
+            image (np.ndarray): Authentic page in OpenCV format
+            label (str): Name of the template
+        """
+        regions = self._segment_image(image)
+        for region_idx in range(len(regions)):
+            self.template_index.add_template(
+                regions.crop(region_idx, [image]),
+                regions.region_type(region_idx),
+                label
+            )
+
+    def _segment_image(self, image, page_index=0):
+        # Split the page into header, body and signature bands
+        height, width = image.shape[:2]
+        header_end = int(height * self.HEADER_FRACTION)
+        signature_start = int(height * (1 - self.SIGNATURE_FRACTION))
+        
+        return RegionTable.from_boxes(
+            page_index,
+            [
+                (0, 0, width, header_end),
+                (0, header_end, width, signature_start - header_end),
+                (0, signature_start, width, height - signature_start)
+            ],
+            type_code=[REGION_CODES['header'], REGION_CODES['body'], REGION_CODES['signature']]
+        )
+
+    def _analyze_region(self, match):
+        if match is None:
+            return self.DEFAULT_SIMILARITY
+        
+        # Map the Hamming distance to the nearest template onto [0, 1]
+        distance, _ = match
+        return 1.0 - distance / HASH_BITS
+
+    def _detect_issues(self, match, region_type):
+        if match is None:
+            return []
+        
+        distance, label = match
+        if distance > settings.TEMPLATE_MAX_DISTANCE:
+            return [
+                f"Layout differs from closest authentic {region_type} template "
+                f"'{label}' ({distance}/{HASH_BITS} bits)"
+            ]
+        return []
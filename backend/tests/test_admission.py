@@ -0,0 +1,188 @@
+import asyncio
+import pytest
+from src.services.admission import AdmissionController, AdmissionRejected
+
+def _controller(budget=100, max_queue=4, queue_timeout=5.0):
+    return AdmissionController(
+        budget_bytes=budget,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+        page_memory_factor=2.0,
+        request_overhead_bytes=10
+    )
+
+async def _hold(controller, cost, release, admitted=None, name=None):
+    async with controller.admit(cost):
+        if admitted is not None:
+            admitted.append(name)
+        await release.wait()
+
+async def _settle():
+    # Let every runnable task reach its next await
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_estimate_cost():
+    assert _controller().estimate_cost(page_count=3, page_bytes=5) == 10 + 3 * 5 * 2
+
+def test_waiters_are_admitted_in_fifo_order():
+    async def scenario():
+        controller = _controller()
+        admitted = []
+        first_release, big_release, small_release = asyncio.Event(), asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(_hold(controller, 50, first_release, admitted, "first"))
+        await _settle()
+        big = asyncio.create_task(_hold(controller, 80, big_release, admitted, "big"))
+        await _settle()
+        # Would fit right now, but must not overtake the queued big request
+        small = asyncio.create_task(_hold(controller, 10, small_release, admitted, "small"))
+        await _settle()
+        assert admitted == ["first"]
+        assert len(controller._waiters) == 2
+
+        first_release.set()
+        await _settle()
+        # 80 + 10 fits the budget, so the small request follows the big one
+        assert admitted == ["first", "big", "small"]
+
+        big_release.set()
+        small_release.set()
+        await asyncio.gather(first, big, small)
+        assert admitted == ["first", "big", "small"]
+        assert controller.inflight_bytes == 0 and controller.inflight_requests == 0
+
+    asyncio.run(scenario())
+
+def test_wait_times_out():
+    async def scenario():
+        controller = _controller(queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, 100, release))
+        await _settle()
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            async with controller.admit(10):
+                pass
+        assert excinfo.value.reason == "timeout"
+        assert excinfo.value.retry_after >= 1
+        assert not controller._waiters
+
+        release.set()
+        await holder
+        assert controller.inflight_bytes == 0
+
+    asyncio.run(scenario())
+
+def test_full_queue_is_shed():
+    async def scenario():
+        controller = _controller(max_queue=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, 100, release))
+        await _settle()
+        waiter = asyncio.create_task(_hold(controller, 10, release))
+        await _settle()
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            async with controller.admit(10):
+                pass
+        assert excinfo.value.reason == "queue_full"
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert controller.inflight_requests == 0
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = _controller()
+        admitted = []
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, 100, release))
+        await _settle()
+        cancelled = asyncio.create_task(_hold(controller, 10, release, admitted, "cancelled"))
+        await _settle()
+        behind = asyncio.create_task(_hold(controller, 10, release, admitted, "behind"))
+        await _settle()
+
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert len(controller._waiters) == 1
+
+        # The request queued behind the cancelled one is still admitted
+        release.set()
+        await asyncio.gather(holder, behind)
+        assert admitted == ["behind"]
+        assert controller.inflight_bytes == 0 and not controller._waiters
+
+    asyncio.run(scenario())
+
+def test_request_larger_than_budget_runs_alone():
+    async def scenario():
+        controller = _controller()
+        admitted = []
+        small_release, huge_release, after_release = asyncio.Event(), asyncio.Event(), asyncio.Event()
+        small = asyncio.create_task(_hold(controller, 10, small_release, admitted, "small"))
+        await _settle()
+        huge = asyncio.create_task(_hold(controller, 250, huge_release, admitted, "huge"))
+        await _settle()
+        after = asyncio.create_task(_hold(controller, 10, after_release, admitted, "after"))
+        await _settle()
+        # The oversized request waits for the in-flight one, and holds up the queue
+        assert admitted == ["small"]
+
+        small_release.set()
+        await _settle()
+        assert admitted == ["small", "huge"]
+        assert controller.inflight_requests == 1 and controller.inflight_bytes == 250
+
+        huge_release.set()
+        await _settle()
+        assert admitted == ["small", "huge", "after"]
+
+        after_release.set()
+        await asyncio.gather(small, huge, after)
+        assert controller.inflight_bytes == 0 and not controller._waiters
+
+    asyncio.run(scenario())
+
+def test_idle_server_admits_oversized_request_immediately():
+    async def scenario():
+        controller = _controller()
+        async with controller.admit(1000):
+            assert controller.inflight_requests == 1
+        assert controller.inflight_bytes == 0
+
+    asyncio.run(scenario())
+
+def test_capacity_is_released_on_error():
+    async def scenario():
+        controller = _controller()
+        with pytest.raises(RuntimeError):
+            async with controller.admit(60):
+                raise RuntimeError("analysis failed")
+        assert controller.inflight_bytes == 0 and controller.inflight_requests == 0
+
+    asyncio.run(scenario())
+
+def test_waiter_cancelled_after_grant_releases_capacity():
+    async def scenario():
+        controller = _controller()
+        admitted = []
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, 100, release))
+        await _settle()
+        waiter = asyncio.create_task(_hold(controller, 40, release, admitted, "waiter"))
+        await _settle()
+
+        # Capacity is reserved for the waiter, which is cancelled before it resumes
+        release.set()
+        await holder
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert admitted == []
+        assert controller.inflight_bytes == 0 and controller.inflight_requests == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from src.services.exemplar_index import ExemplarIndex
+
+DIM = 16
+
+def _brute_force(vectors, labels, query, k):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = query / np.linalg.norm(query)
+    order = np.argsort(-(vectors @ query))[:k]
+    return [labels[i] for i in order]
+
+@pytest.fixture
+def gallery():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, DIM)).astype(np.float32)
+    labels = [f"writer{i}" for i in range(len(vectors))]
+    return vectors, labels
+
+@pytest.mark.parametrize("ivf", [False, True])
+def test_search_returns_exact_neighbours(tmp_path, gallery, ivf):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    index.add(vectors, labels)
+    if ivf:
+        # Probing every list must give the same answer as a full scan
+        index.build_ivf(n_lists=8, nprobe=8)
+
+    scores, rows = index.search(vectors[:5], k=3)
+    for qi in range(5):
+        assert [index.label_of(r) for r in rows[qi]] == _brute_force(vectors, labels, vectors[qi], 3)
+        assert np.all(np.diff(scores[qi]) <= 0)
+    assert index.label_of(int(rows[0, 0])) == "writer0"
+    assert scores[0, 0] == pytest.approx(1.0)
+
+@pytest.mark.parametrize("ivf", [False, True])
+def test_add_after_build_ivf_is_searchable(tmp_path, gallery, ivf):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    index.add(vectors[:100], labels[:100])
+    if ivf:
+        index.build_ivf(n_lists=4, nprobe=4)
+    index.add(vectors[100:], labels[100:])
+
+    assert len(index) == 200
+    _, rows = index.search(vectors[150:151], k=1)
+    assert index.label_of(int(rows[0, 0])) == "writer150"
+
+@pytest.mark.parametrize("ivf", [False, True])
+def test_remove_compact_and_reload(tmp_path, gallery, ivf):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    ids = index.add(vectors, labels)
+    if ivf:
+        index.build_ivf(n_lists=8, nprobe=8)
+
+    assert index.remove(ids[:10]) == 10
+    assert index.remove(ids[:10]) == 0
+    assert index.remove_label("writer10") == 1
+    assert len(index) == 189
+
+    _, rows = index.search(vectors[:11], k=1)
+    found = {index.label_of(int(r)) for r in rows[:, 0]}
+    assert not found & {f"writer{i}" for i in range(11)}
+
+    index.compact()
+    assert len(index) == 189
+    assert len(index.ids) == 189
+
+    reloaded = ExemplarIndex(str(tmp_path), dim=DIM)
+    assert len(reloaded) == 189
+    assert reloaded.ids == ids[11:]
+    scores, rows = reloaded.search(vectors[50:51], k=2)
+    assert reloaded.label_of(int(rows[0, 0])) == "writer50"
+    assert reloaded.label_of(int(rows[0, 1])) == _brute_force(vectors[11:], labels[11:], vectors[50], 2)[1]
+
+    # Ids keep increasing after a reload so removed ids are never reused
+    assert reloaded.add(vectors[:1], ["writer0"]) == [200]
+
+def test_search_pads_missing_neighbours(tmp_path):
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    scores, rows = index.search(np.ones((2, DIM)), k=3)
+    assert np.all(rows == -1) and np.all(np.isneginf(scores))
+
+    index.add(np.ones((1, DIM)), ["only"])
+    scores, rows = index.search(np.ones((1, DIM)), k=3)
+    assert rows[0].tolist() == [0, -1, -1]
+    assert np.isneginf(scores[0, 1:]).all()
+
+def test_add_rejects_mismatched_labels(tmp_path):
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    with pytest.raises(ValueError):
+        index.add(np.ones((2, DIM)), ["one"])
+
+def test_ivf_scans_only_probed_lists(tmp_path, gallery):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    index.add(vectors, labels)
+    index.build_ivf(n_lists=8, nprobe=1)
+
+    query = vectors[7]
+    cluster = int(np.argmax(index._centroids @ (query / np.linalg.norm(query))))
+    members = np.flatnonzero(np.asarray(index._assignments) == cluster)
+
+    _, rows = index.search(query, k=len(vectors))
+    found = rows[0][rows[0] >= 0]
+    assert sorted(found.tolist()) == members.tolist()
+
+def test_incremental_adds_keep_ivf_lists_exact(tmp_path, gallery):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    index.add(vectors[:40], labels[:40])
+    index.build_ivf(n_lists=8, nprobe=8)
+    for start in range(40, 200, 16):
+        index.add(vectors[start:start + 16], labels[start:start + 16])
+    meta_size = (tmp_path / "meta.json").stat().st_size
+
+    # Metadata stays small however large the gallery grows
+    assert meta_size < 512
+    assert int(index._list_sizes.sum()) == 200
+    _, rows = index.search(vectors[190:191], k=3)
+    assert [index.label_of(r) for r in rows[0]] == _brute_force(vectors, labels, vectors[190], 3)
+
+def test_remove_ignores_unknown_ids(tmp_path, gallery):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    ids = index.add(vectors[:5], labels[:5])
+    assert index.remove([ids[-1] + 100, -3]) == 0
+    assert index.remove([ids[4], ids[4], 999]) == 1
+    assert len(index) == 4
+
+def test_interrupted_append_is_ignored(tmp_path, gallery):
+    vectors, labels = gallery
+    index = ExemplarIndex(str(tmp_path), dim=DIM)
+    index.add(vectors[:10], labels[:10])
+    index.remove([3])
+
+    # Simulate writes that never reached meta.json
+    for name in ("vectors.f32", "ids.i64", "labels.jsonl", "deleted.i64"):
+        with open(tmp_path / name, "ab") as f:
+            f.write(b"\x01partial")
+
+    reloaded = ExemplarIndex(str(tmp_path), dim=DIM)
+    assert len(reloaded) == 9
+    assert reloaded.labels == labels[:10]
+    reloaded.add(vectors[10:12], labels[10:12])
+    reloaded.remove([5])
+
+    again = ExemplarIndex(str(tmp_path), dim=DIM)
+    assert len(again) == 10
+    assert again.labels == labels[:12]
+    _, rows = again.search(vectors[11:12], k=1)
+    assert again.label_of(int(rows[0, 0])) == "writer11"
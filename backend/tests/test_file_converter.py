@@ -0,0 +1,25 @@
+from unittest import mock
+import pytest
+from src.services import file_converter
+from src.services.file_converter import FileConverter
+
+def test_page_layout_uses_largest_page():
+    info = {
+        "Pages": 3,
+        "Page    1 size": "612 x 792 pts (letter)",
+        "Page    2 size": "841.89 x 1190.55 pts (A3)",
+        "Page    3 size": "612 x 792 pts (letter)",
+        "Page    1 rot": "0"
+    }
+    converter = FileConverter()
+    with mock.patch.object(file_converter, "pdfinfo_from_bytes", return_value=info):
+        page_count, page_bytes = converter.page_layout(b"%PDF")
+
+    assert page_count == 3
+    a3_pixels = (841.89 / 72 * converter.dpi) * (1190.55 / 72 * converter.dpi)
+    assert page_bytes == pytest.approx(a3_pixels * 3, rel=1e-3)
+
+def test_page_layout_rejects_unreadable_pdf():
+    with mock.patch.object(file_converter, "pdfinfo_from_bytes", side_effect=ValueError("bad")):
+        with pytest.raises(Exception, match="Error reading PDF page layout"):
+            FileConverter().page_layout(b"not a pdf")
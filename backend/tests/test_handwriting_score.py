@@ -0,0 +1,55 @@
+import numpy as np
+from src.config import settings
+from src.models.analysis import HandwritingAnomaly
+from src.services.handwriting_analyzer import HandwritingAnalyzer
+
+LOCATION = "page 1, region 1"
+
+class _StubIndex:
+    def label_of(self, row):
+        return "writer"
+
+def _analyzer():
+    # Skip __init__ so no model weights are needed
+    analyzer = HandwritingAnalyzer.__new__(HandwritingAnalyzer)
+    analyzer.exemplar_index = _StubIndex()
+    return analyzer
+
+def _anomaly(anomaly_type, confidence):
+    return HandwritingAnomaly(location=LOCATION, type=anomaly_type, confidence=confidence, description="")
+
+def test_score_drops_as_confidence_rises():
+    analyzer = _analyzer()
+    for anomaly_type in ("style", "pressure", "spacing"):
+        scores = [
+            analyzer._calculate_score([_anomaly(anomaly_type, c)])
+            for c in np.linspace(0.0, 1.0, 21)
+        ]
+        assert all(a > b for a, b in zip(scores, scores[1:]))
+
+    # Raising one anomaly's confidence lowers the score of a mixed set too
+    low = analyzer._calculate_score([_anomaly("style", 0.2), _anomaly("pressure", 0.85)])
+    high = analyzer._calculate_score([_anomaly("style", 0.9), _anomaly("pressure", 0.85)])
+    assert high < low
+    assert analyzer._calculate_score([]) == 1.0
+
+def test_exemplar_confidence_rises_as_similarity_drops():
+    analyzer = _analyzer()
+    rows = np.array([0])
+    below = settings.EXEMPLAR_MATCH_THRESHOLD - 0.01
+    similarities = np.linspace(below, -1.0, 21)
+
+    anomalies = [analyzer._match_exemplars(np.array([s]), rows, LOCATION) for s in similarities]
+    confidences = [found[0].confidence for found in anomalies]
+    assert all(a <= b for a, b in zip(confidences, confidences[1:]))
+    assert confidences[0] < 0.5 and confidences[-1] == 1.0
+
+    # A worse match never scores higher
+    scores = [analyzer._calculate_score(found) for found in anomalies]
+    assert all(a >= b for a, b in zip(scores, scores[1:]))
+
+def test_no_anomaly_for_a_good_match_or_without_exemplars():
+    analyzer = _analyzer()
+    rows = np.array([0])
+    assert analyzer._match_exemplars(np.array([settings.EXEMPLAR_MATCH_THRESHOLD]), rows, LOCATION) == []
+    assert analyzer._match_exemplars(np.array([-np.inf]), np.array([-1]), LOCATION) == []
@@ -0,0 +1,52 @@
+import random
+import numpy as np
+from src.services.template_index import BKTree, TemplateIndex, hamming_distance
+
+def _flip(hash_value, bits, rng):
+    for bit in rng.sample(range(64), bits):
+        hash_value ^= 1 << bit
+    return hash_value
+
+def _hashes(rng, clusters=20, per_cluster=25):
+    # Near-duplicates around a few centres, like segments of the same template
+    hashes = []
+    for _ in range(clusters):
+        centre = rng.getrandbits(64)
+        hashes.extend(_flip(centre, rng.randint(0, 10), rng) for _ in range(per_cluster))
+    return hashes
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(0)
+    hashes = _hashes(rng)
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        tree.add(h, f"t{i}")
+    assert tree.size == len(hashes)
+
+    queries = [_flip(rng.choice(hashes), rng.randint(0, 20), rng) for _ in range(200)]
+    queries += [rng.getrandbits(64) for _ in range(50)]
+    for query in queries:
+        distance, payload = tree.nearest(query)
+        expected = min(hamming_distance(query, h) for h in hashes)
+        assert distance == expected
+        assert hamming_distance(query, hashes[int(payload[1:])]) == expected
+
+def test_nearest_exact_and_empty():
+    tree = BKTree()
+    assert tree.nearest(0) is None
+    tree.add(0xFF, "a")
+    tree.add(0xFF, "b")
+    assert tree.nearest(0xFF) == (0, "a")
+    assert tree.nearest(0xFE) == (1, "a")
+
+def test_template_index_reload(tmp_path):
+    path = tmp_path / "templates.json"
+    index = TemplateIndex(str(path))
+    image = np.zeros((64, 64), dtype=np.uint8)
+    image[:, :32] = 255
+    index.add_template(image, "header", "letterhead")
+
+    reloaded = TemplateIndex(str(path))
+    assert len(reloaded) == 1
+    assert reloaded.nearest(image, "header") == (0, "letterhead")
+    assert reloaded.nearest(image, "signature") is None
@@ -0,0 +1,196 @@
+import argparse
+import random
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+
+# US Letter in PDF points
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+
+# Resolution of the raster embedded in "scanned" pages
+SCAN_DPI = 150
+
+WORDS = (
+    "agreement party hereby shall payment date signature witness notary "
+    "clause section amount total account terms conditions effective period "
+    "lessee lessor premises deposit invoice received certify declare"
+).split()
+
+# Page kinds cycled through by each document profile
+PROFILES: Dict[str, List[str]] = {
+    "vector": ["vector"],
+    "dense": ["dense"],
+    "scanned": ["scanned"],
+    "form": ["form"],
+    "mixed": ["vector", "dense", "scanned", "form"],
+}
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+def _text_stream(rng: random.Random, lines: int, font_size: float) -> List[str]:
+    ops = ["BT", f"/F1 {font_size} Tf", f"{font_size * 1.2:.1f} TL", f"50 {PAGE_HEIGHT - 60} Td"]
+    for _ in range(lines):
+        ops.append(f"({_escape(_sentence(rng, rng.randint(6, 12)))}) '")
+    ops.append("ET")
+    return ops
+
+def _signature_stroke(rng: random.Random, x: float, y: float, width: float) -> List[str]:
+    # A random cursive-like Bezier squiggle inside a signature box
+    ops = ["1.2 w", f"{x:.1f} {y:.1f} m"]
+    step = width / 6
+    for i in range(6):
+        x0 = x + step * i
+        ops.append(
+            f"{x0 + step * 0.3:.1f} {y + rng.uniform(5, 25):.1f} "
+            f"{x0 + step * 0.7:.1f} {y - rng.uniform(5, 15):.1f} "
+            f"{x0 + step:.1f} {y + rng.uniform(-5, 5):.1f} c"
+        )
+    ops.append("S")
+    return ops
+
+def _vector_page(rng: random.Random) -> List[str]:
+    return _text_stream(rng, 25, 11)
+
+def _dense_page(rng: random.Random) -> List[str]:
+    return _text_stream(rng, 90, 7)
+
+def _form_page(rng: random.Random) -> List[str]:
+    ops = ["BT", "/F1 16 Tf", f"50 {PAGE_HEIGHT - 60} Td", "(APPLICATION FORM) Tj", "ET", "0.8 w"]
+    y = PAGE_HEIGHT - 110
+    for _ in range(10):
+        ops += ["BT", "/F1 10 Tf", f"50 {y + 6} Td", f"({_escape(rng.choice(WORDS).title())}:) Tj", "ET"]
+        ops.append(f"160 {y} 380 20 re S")
+        y -= 40
+
+    # Signature boxes with a handwritten stroke in the first one
+    ops += ["BT", "/F1 10 Tf", "50 140 Td", "(Signature) Tj", "ET", "50 60 220 70 re S", "340 60 220 70 re S"]
+    ops += _signature_stroke(rng, 65, 90, 190)
+    return ops
+
+def _scanned_image(rng: random.Random) -> Tuple[int, int, bytes]:
+    # Rasterise a text page and add scanner noise and a slight grey cast
+    width = PAGE_WIDTH * SCAN_DPI // 72
+    height = PAGE_HEIGHT * SCAN_DPI // 72
+    image = Image.new("L", (width, height), 235)
+    draw = ImageDraw.Draw(image)
+    y = 100
+    while y < height - 250:
+        draw.text((100, y), _sentence(rng, rng.randint(6, 12)), fill=rng.randint(10, 60))
+        y += 30
+    draw.rectangle((100, height - 220, 600, height - 80), outline=30, width=2)
+
+    pixels = np.asarray(image, dtype=np.int16)
+    noise = np.random.default_rng(rng.randint(0, 2 ** 32 - 1)).normal(0, 8, pixels.shape)
+    pixels = np.clip(pixels + noise, 0, 255).astype(np.uint8)
+    return width, height, zlib.compress(pixels.tobytes(), 6)
+
+class _PdfWriter:
+    """Minimal PDF 1.4 writer: Helvetica text, vector paths and greyscale images."""
+
+    def __init__(self):
+        self.objects: List[bytes] = []
+
+    def add(self, body: bytes) -> int:
+        self.objects.append(body)
+        return len(self.objects)
+
+    def reserve(self) -> int:
+        return self.add(b"")
+
+    def stream(self, dictionary: str, data: bytes) -> int:
+        return self.add(f"<< {dictionary} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    def write(self, path: Path, root: int):
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(self.objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+        xref = len(out)
+        out += f"xref\n0 {len(self.objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode()
+        out += f"trailer\n<< /Size {len(self.objects) + 1} /Root {root} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        path.write_bytes(bytes(out))
+
+def generate_pdf(path: Path, page_kinds: List[str], seed: int = 0):
+    """
+    Write a synthetic PDF with one page per entry of ``page_kinds``.
+
+    Args:
+        path: Output file
+        page_kinds: Sequence of 'vector', 'dense', 'scanned' or 'form'
+        seed: Random seed; the same seed always produces the same file
+    """
+    rng = random.Random(seed)
+    pdf = _PdfWriter()
+    catalog = pdf.reserve()
+    pages_obj = pdf.reserve()
+    font = pdf.add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    builders = {"vector": _vector_page, "dense": _dense_page, "form": _form_page}
+    page_refs = []
+    for kind in page_kinds:
+        resources = f"/Font << /F1 {font} 0 R >>"
+        if kind == "scanned":
+            width, height, data = _scanned_image(rng)
+            image = pdf.stream(
+                f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode",
+                data
+            )
+            resources += f" /XObject << /Im1 {image} 0 R >>"
+            ops = ["q", f"{PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm", "/Im1 Do", "Q"]
+        else:
+            ops = builders[kind](rng)
+
+        content = pdf.stream("", "\n".join(ops).encode("latin-1"))
+        page_refs.append(pdf.add(
+            f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << {resources} >> /Contents {content} 0 R >>".encode()
+        ))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    pdf.objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode()
+    pdf.objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+    pdf.write(path, catalog)
+
+def generate_corpus(output_dir: Path, page_counts=(1, 5, 20), seed: int = 0) -> List[Path]:
+    """
+    Generate one PDF per profile and page count.
+
+    Returns:
+        List[Path]: Generated files, named ``<profile>_<pages>p.pdf``
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for profile_idx, (profile, kinds) in enumerate(PROFILES.items()):
+        for pages in page_counts:
+            path = output_dir / f"{profile}_{pages}p.pdf"
+            page_kinds = [kinds[i % len(kinds)] for i in range(pages)]
+            generate_pdf(path, page_kinds, seed=seed * 1000 + profile_idx * 100 + pages)
+            paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PDF benchmark corpus")
+    parser.add_argument("--output_dir", type=str, required=True, help="Directory to write PDFs to")
+    parser.add_argument("--pages", type=str, default="1,5,20", help="Comma-separated page counts")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+
+    page_counts = [int(p) for p in args.pages.split(",")]
+    for path in generate_corpus(Path(args.output_dir), page_counts, args.seed):
+        print(f"Generated {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def _multipart(filename: str, content: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+def _post(url: str, body: bytes, content_type: str, timeout: float) -> Tuple[int, float]:
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - start
+
+def start_server(port: int, timeout: float = 120) -> subprocess.Popen:
+    """Start the FastAPI app under uvicorn and wait until it answers."""
+    # Run from the repository root, like the in-process benchmarks, so the
+    # relative model and index paths in settings resolve to the same files
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.src.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Server did not start in time")
+
+def run_load(base_url: str, paths: List[Path], clients: int, requests_per_client: int, timeout: float = 300) -> dict:
+    """
+    Drive ``/api/analyze`` with concurrent clients cycling through ``paths``.
+
+    Returns:
+        dict: Throughput, error count and latency percentiles
+    """
+    url = f"{base_url.rstrip('/')}/api/analyze"
+    payloads = [_multipart(path.name, path.read_bytes()) for path in paths]
+
+    def client(client_idx: int) -> List[Tuple[int, float]]:
+        results = []
+        for i in range(requests_per_client):
+            body, content_type = payloads[(client_idx + i) % len(payloads)]
+            results.append(_post(url, body, content_type, timeout))
+        return results
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        outcomes = [r for results in pool.map(client, range(clients)) for r in results]
+    wall = time.perf_counter() - start
+
+    statuses = np.array([status for status, _ in outcomes])
+    latencies_ms = np.array([seconds for _, seconds in outcomes]) * 1000
+    ok = statuses == 200
+    return {
+        "clients": clients,
+        "requests": len(outcomes),
+        "errors": int((~ok).sum()),
+        "requests_per_s": float(ok.sum() / wall),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "max_ms": float(latencies_ms.max()),
+    }
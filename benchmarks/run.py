@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from backend.src.services.document_processor import DocumentProcessor
+from backend.src.services.metrics import metrics
+from benchmarks.corpus import generate_corpus
+from benchmarks.load import run_load, start_server
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    samples_ms = np.array(samples) * 1000
+    return {
+        "median_ms": float(np.median(samples_ms)),
+        "p95_ms": float(np.percentile(samples_ms, 95)),
+    }
+
+def _max_rss_bytes() -> int:
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _measure_peak_rss(path: Path) -> Tuple[float, float]:
+    """
+    Analyze one document and report the process's peak resident set size.
+
+    Runs in a fresh process: ru_maxrss is a high-water mark for the life of
+    a process, so earlier documents would otherwise mask smaller ones. RSS
+    also covers native buffers (OpenCV, poppler, torch) that tracemalloc
+    does not see.
+
+    Returns:
+        Tuple[float, float]: Peak RSS in MB, and how far analysis raised it
+        above the peak after loading the models
+    """
+    processor = DocumentProcessor()
+    loaded = _max_rss_bytes()
+    asyncio.run(processor.analyze(path.read_bytes()))
+    peak = _max_rss_bytes()
+    return peak / 2 ** 20, (peak - loaded) / 2 ** 20
+
+def bench_end_to_end(processor, paths: List[Path], repeat: int) -> dict:
+    """Time ``DocumentProcessor.analyze`` per document, with stage breakdown and peak memory."""
+    loop = asyncio.new_event_loop()
+    results = {}
+    for path in paths:
+        content = path.read_bytes()
+        samples = []
+        stages: Dict[str, List[float]] = {}
+        for _ in range(repeat):
+            with metrics.request_timings() as timings:
+                start = time.perf_counter()
+                loop.run_until_complete(processor.analyze(content))
+                samples.append(time.perf_counter() - start)
+            for stage, seconds in timings.items():
+                stages.setdefault(stage, []).append(seconds)
+
+        # Memory is measured in a fresh process so the peak belongs to this document
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            peak_rss_mb, analyze_rss_mb = pool.submit(_measure_peak_rss, path).result()
+
+        # Measured memory per page buffer, to calibrate ADMISSION_PAGE_MEMORY_FACTOR;
+        # it includes model activations, so multi-page documents give the best estimate
+        page_count, page_bytes = processor.file_converter.page_layout(content)
+
+        results[path.stem] = {
+            **_latency_summary(samples),
+            "peak_rss_mb": peak_rss_mb,
+            "analyze_rss_mb": analyze_rss_mb,
+            "page_memory_factor": analyze_rss_mb * 2 ** 20 / (page_count * page_bytes),
+            "stages": {stage: {"median_ms": float(np.median(s) * 1000)} for stage, s in stages.items()},
+        }
+        print(f"{path.stem}: {results[path.stem]['median_ms']:.1f} ms, {peak_rss_mb:.1f} MB peak RSS")
+    loop.close()
+    return results
+
+def bench_analyzers(processor, paths: List[Path]) -> dict:
+    """
+    Measure pages/s and regions/s of each pipeline component over the whole corpus.
+
+    Documents are processed one at a time, so only one document's pages are
+    held in memory; each component's time is summed across documents.
+    """
+    loop = asyncio.new_event_loop()
+    converter = processor.file_converter
+    seconds = dict.fromkeys(("rasterize", "preprocess", "extract_regions", "visual", "text", "handwriting"), 0.0)
+    n = layout_regions = handwriting_regions = 0
+
+    def timed(component, fn):
+        start = time.perf_counter()
+        value = fn()
+        seconds[component] += time.perf_counter() - start
+        return value
+
+    for path in paths:
+        content = path.read_bytes()
+        pages = timed("rasterize", lambda: loop.run_until_complete(converter.pdf_to_images(content)))
+        preprocessed = timed("preprocess", lambda: [converter.preprocess_image(page) for page in pages])
+        regions = timed("extract_regions", lambda: [
+            converter.extract_regions(page, idx) for idx, page in enumerate(preprocessed)
+        ])
+        timed("visual", lambda: loop.run_until_complete(processor.visual_analyzer.analyze(pages)))
+        timed("text", lambda: loop.run_until_complete(processor.text_analyzer.analyze(preprocessed)))
+        timed("handwriting", lambda: loop.run_until_complete(processor.handwriting_analyzer.analyze(pages)))
+
+        n += len(pages)
+        layout_regions += sum(len(table) for table in regions)
+        handwriting_regions += sum(
+            len(processor.handwriting_analyzer._detect_handwriting_regions(page, idx))
+            for idx, page in enumerate(pages)
+        )
+        # Release this document's pages before rasterizing the next one
+        del pages, preprocessed, regions
+    loop.close()
+
+    return {
+        "rasterize": {"pages_per_s": n / seconds["rasterize"]},
+        "preprocess": {"pages_per_s": n / seconds["preprocess"]},
+        "extract_regions": {
+            "pages_per_s": n / seconds["extract_regions"],
+            "regions_per_s": layout_regions / seconds["extract_regions"]
+        },
+        "visual": {"pages_per_s": n / seconds["visual"]},
+        "text": {"pages_per_s": n / seconds["text"]},
+        "handwriting": {
+            "pages_per_s": n / seconds["handwriting"],
+            "regions_per_s": handwriting_regions / seconds["handwriting"]
+        },
+    }
+
+def _flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+def compare(current: dict, baseline: dict, threshold: float, min_ms: float = 1.0, min_mb: float = 5.0) -> List[str]:
+    """
+    Compare two result files metric by metric.
+
+    Metrics ending in ``_ms`` or ``_mb`` are lower-is-better, ``_per_s`` are
+    higher-is-better; everything else is ignored. Per-stage medians are
+    recorded for information only: short stages swing by large fractions on
+    noise alone. A latency or memory change must also exceed ``min_ms`` or
+    ``min_mb`` in absolute terms to count.
+
+    Returns:
+        List[str]: Descriptions of metrics that regressed by more than ``threshold``
+    """
+    current_flat = _flatten(current["results"])
+    baseline_flat = _flatten(baseline["results"])
+    regressions = []
+    for name, old in baseline_flat.items():
+        new = current_flat.get(name)
+        if new is None or old <= 0 or ".stages." in name:
+            continue
+        if name.endswith("_ms"):
+            if new - old < min_ms:
+                continue
+            change = (new - old) / old
+        elif name.endswith("_mb"):
+            if new - old < min_mb:
+                continue
+            change = (new - old) / old
+        elif name.endswith("_per_s"):
+            change = (old - new) / old
+        else:
+            continue
+        if change > threshold:
+            regressions.append(f"{name}: {old:.3f} -> {new:.3f} ({change:+.1%} worse)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the document analysis benchmarks")
+    parser.add_argument("--corpus", type=str, help="Existing corpus directory (generated if omitted)")
+    parser.add_argument("--pages", type=str, default="1,5,20", help="Page counts for the generated corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per document")
+    parser.add_argument("--clients", type=int, default=0, help="Concurrent API clients (0 skips the load test)")
+    parser.add_argument("--requests", type=int, default=5, help="Requests per API client")
+    parser.add_argument("--url", type=str, help="Running API to load test (a local server is started if omitted)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the local server")
+    parser.add_argument("--output", type=str, help="Path to save results JSON")
+    parser.add_argument("--baseline", type=str, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative regression that fails the run")
+    parser.add_argument("--min_ms", type=float, default=1.0, help="Ignore latency changes smaller than this")
+    parser.add_argument("--min_mb", type=float, default=5.0, help="Ignore memory changes smaller than this")
+
+    args = parser.parse_args()
+
+    if args.corpus:
+        paths = sorted(Path(args.corpus).glob("*.pdf"))
+    else:
+        corpus_dir = Path(tempfile.mkdtemp(prefix="bench_corpus_"))
+        paths = generate_corpus(corpus_dir, [int(p) for p in args.pages.split(",")])
+
+    processor = DocumentProcessor()
+
+    results = {
+        "end_to_end": bench_end_to_end(processor, paths, args.repeat),
+        "analyzers": bench_analyzers(processor, paths),
+    }
+
+    if args.clients:
+        server = None if args.url else start_server(args.port)
+        try:
+            url = args.url or f"http://127.0.0.1:{args.port}"
+            results["load"] = run_load(url, paths, args.clients, args.requests)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "documents": [path.name for path in paths],
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    print(json.dumps(results["analyzers"], indent=2))
+    if "load" in results:
+        print(json.dumps(results["load"], indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_ms, args.min_mb)
+        if regressions:
+            print(f"\nRegressions against {baseline['meta']['commit']}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {baseline['meta']['commit']}")
+
+if __name__ == "__main__":
+    main()
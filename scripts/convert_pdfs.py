@@ -1,49 +1,186 @@
 import argparse
-from pathlib import Path
-from pdf2image import convert_from_path
+import hashlib
+import json
 import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+MANIFEST_NAME = ".convert_manifest.json"
 
-def convert_pdf_to_images(pdf_path: Path, output_dir: Path, dpi: int = 300):
+def file_sha256(path: Path) -> str:
+    """Hash a file in chunks so large PDFs are never fully loaded."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def convert_pdf_to_images(pdf_path: Path, output_dir: Path, dpi: int = 300, threads: int = 1, chunk_size: int = 16) -> List[Path]:
     """Convert a PDF file to a series of PNG images.
-    
+
+    Pages are rendered by poppler straight to disk in chunks, so at most one
+    chunk of pages is in flight and no page is ever decoded into memory.
+
     Args:
         pdf_path: Path to the PDF file
         output_dir: Directory to save the images
         dpi: Resolution for the output images
+        threads: Number of poppler processes rendering each chunk
+        chunk_size: Pages rendered per chunk
+
+    Returns:
+        List[Path]: Saved page images, in page order, or an empty list if
+        any page failed to convert
     """
     # Create output directory if it doesn't exist
     output_dir.mkdir(parents=True, exist_ok=True)
-    
+
     # Get base name of PDF file (without extension)
     base_name = pdf_path.stem
-    
+    saved = []
+    page_count = None
+
     try:
-        # Convert PDF to images
-        images = convert_from_path(pdf_path, dpi=dpi)
-        
-        # Save each page as PNG
-        for i, image in enumerate(images):
-            image_path = output_dir / f"{base_name}_page{i+1}.png"
-            image.save(image_path, "PNG")
-            print(f"Saved {image_path}")
-            
+        page_count = pdfinfo_from_path(pdf_path)["Pages"]
+
+        # Render into a scratch directory next to the output, then move each
+        # page into place under its final name as soon as its chunk is done
+        with tempfile.TemporaryDirectory(dir=output_dir) as scratch:
+            for first_page in range(1, page_count + 1, chunk_size):
+                last_page = min(first_page + chunk_size - 1, page_count)
+                rendered = convert_from_path(
+                    pdf_path,
+                    dpi=dpi,
+                    first_page=first_page,
+                    last_page=last_page,
+                    output_folder=scratch,
+                    fmt="png",
+                    paths_only=True,
+                    thread_count=threads
+                )
+
+                for rendered_path in rendered:
+                    # pdftoppm suffixes each file with its page number
+                    page = int(re.search(r"-(\d+)\.png$", rendered_path).group(1))
+                    image_path = output_dir / f"{base_name}_page{page}.png"
+                    os.replace(rendered_path, image_path)
+                    saved.append(image_path)
+                    print(f"Saved {image_path}")
+
     except Exception as e:
         print(f"Error converting {pdf_path}: {str(e)}")
 
+    if len(saved) != page_count:
+        # Remove partial output so it is never mistaken for a finished conversion
+        for image_path in saved:
+            image_path.unlink(missing_ok=True)
+        return []
+
+    return saved
+
+def _convert_job(pdf_path: Path, output_dir: Path, dpi: int, threads: int) -> List[str]:
+    return [path.name for path in convert_pdf_to_images(pdf_path, output_dir, dpi, threads)]
+
+def load_manifest(output_dir: Path) -> dict:
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        # Records without a hash come from the older hash-keyed layout; dropping
+        # them converts those PDFs once more
+        return {source: record for source, record in manifest.items() if "sha256" in record}
+    return {}
+
+def save_manifest(output_dir: Path, manifest: dict):
+    # Write atomically so an interrupted run never leaves a corrupt manifest
+    tmp_path = output_dir / f"{MANIFEST_NAME}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, output_dir / MANIFEST_NAME)
+
+def convert_directory(input_dir: Path, output_dir: Path, dpi: int = 300, workers: int = None, threads: int = 1, force: bool = False):
+    """Convert every PDF in a directory, skipping files already converted.
+
+    The manifest in ``output_dir`` maps each source file name to its SHA-256
+    and the images produced from it, so unchanged PDFs are skipped on re-runs.
+    Keying by name keeps PDFs with identical bytes from sharing a record.
+
+    Args:
+        input_dir: Directory containing PDF files
+        output_dir: Directory to save the images
+        dpi: Resolution for the output images
+        workers: Number of PDFs converted in parallel (defaults to CPU count)
+        threads: Number of poppler processes per PDF
+        force: Reconvert every PDF regardless of the manifest
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {} if force else load_manifest(output_dir)
+    pdf_files = sorted(input_dir.glob("*.pdf"))
+
+    # Hashing is I/O bound, so threads are enough
+    with ThreadPoolExecutor() as pool:
+        hashes = dict(zip(pdf_files, pool.map(file_sha256, pdf_files)))
+
+    pending = []
+    for pdf_file, digest in hashes.items():
+        record = manifest.get(pdf_file.name)
+        if (
+            record is not None
+            and record["sha256"] == digest
+            and record["dpi"] == dpi
+            and all((output_dir / name).exists() for name in record["outputs"])
+        ):
+            print(f"Skipping unchanged {pdf_file}")
+            continue
+        pending.append(pdf_file)
+
+    print(f"{len(pending)} of {len(pdf_files)} PDFs need converting")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_convert_job, pdf_file, output_dir, dpi, threads): pdf_file
+            for pdf_file in pending
+        }
+        for future in as_completed(futures):
+            pdf_file = futures[future]
+            outputs = future.result()
+            if not outputs:
+                continue
+
+            # Drop leftover pages from an older version of this source
+            previous = manifest.get(pdf_file.name)
+            if previous is not None:
+                for name in set(previous["outputs"]) - set(outputs):
+                    (output_dir / name).unlink(missing_ok=True)
+
+            manifest[pdf_file.name] = {
+                "sha256": hashes[pdf_file],
+                "dpi": dpi,
+                "outputs": outputs
+            }
+            # Persist after every PDF so an interrupted run keeps its progress
+            save_manifest(output_dir, manifest)
+
 def main():
     parser = argparse.ArgumentParser(description="Convert PDFs to images")
     parser.add_argument("--input_dir", type=str, required=True, help="Directory containing PDF files")
     parser.add_argument("--output_dir", type=str, required=True, help="Directory to save images")
     parser.add_argument("--dpi", type=int, default=300, help="DPI for output images")
-    
+    parser.add_argument("--workers", type=int, default=None, help="PDFs converted in parallel (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=1, help="Poppler rendering processes per PDF")
+    parser.add_argument("--force", action="store_true", help="Reconvert all PDFs, ignoring the manifest")
+
     args = parser.parse_args()
-    
+
     input_dir = Path(args.input_dir)
     output_dir = Path(args.output_dir)
-    
+
     # Process all PDF files in input directory
-    for pdf_file in input_dir.glob("*.pdf"):
-        convert_pdf_to_images(pdf_file, output_dir, args.dpi)
+    convert_directory(input_dir, output_dir, args.dpi, args.workers, args.threads, args.force)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
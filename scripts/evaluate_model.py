@@ -1,78 +1,265 @@
 import argparse
+import csv
+import hashlib
+import sys
+import time
 import torch
+import numpy as np
 from pathlib import Path
-from torch.utils.data import DataLoader
-from backend.src.services.model_trainer import HandwritingDataset
+from typing import Dict, Iterator, List, Tuple
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+from torchvision import transforms
 from backend.src.models.neural_network import SiameseNetwork
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.metrics import (
+    accuracy_score,
+    average_precision_score,
+    precision_recall_curve,
+    precision_recall_fscore_support,
+    roc_auc_score,
+    roc_curve
+)
 import json
 
-def evaluate_model(model_path: Path, test_data_dir: Path, batch_size: int = 32):
-    """Evaluate a trained model on test data.
-    
+class ImagePathDataset(Dataset):
+    """Loads each image of a fixed list of paths exactly once."""
+
+    def __init__(self, paths: List[Path]):
+        self.paths = paths
+        self.transform = transforms.Compose([
+            transforms.Resize((224, 224)),
+            transforms.ToTensor(),
+            transforms.Normalize(
+                mean=[0.485, 0.456, 0.406],
+                std=[0.229, 0.224, 0.225]
+            )
+        ])
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        return self.transform(Image.open(self.paths[idx]).convert('RGB'))
+
+def stream_pairs(pairs_file: Path) -> Iterator[Tuple[str, str, int]]:
+    """Yield (image1, image2, label) rows from a pairs CSV without loading it whole."""
+    with open(pairs_file, newline='') as f:
+        for row in csv.DictReader(f):
+            yield row['image1'], row['image2'], int(row['label'])
+
+def index_pairs(pairs_file: Path, image_root: Path) -> Tuple[List[Path], np.ndarray, np.ndarray, np.ndarray]:
+    """Map every pair onto indices into the list of unique images.
+
+    Returns:
+        Unique image paths, first and second image index per pair, and labels
+    """
+    index: Dict[str, int] = {}
+    left, right, labels = [], [], []
+    for image1, image2, label in stream_pairs(pairs_file):
+        left.append(index.setdefault(image1, len(index)))
+        right.append(index.setdefault(image2, len(index)))
+        labels.append(label)
+
+    paths = [image_root / name for name in index]
+    return paths, np.array(left, dtype=np.int64), np.array(right, dtype=np.int64), np.array(labels, dtype=np.int8)
+
+def _model_fingerprint(model_path: Path) -> str:
+    stat = model_path.stat()
+    return hashlib.sha256(f"{model_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+
+def embed_images(model, paths: List[Path], device, batch_size: int, num_workers: int,
+                 cache_path: Path = None, fingerprint: str = "") -> np.ndarray:
+    """Embed each unique image once, reusing cached embeddings for the same model.
+
+    Args:
+        model: Siamese network whose ``forward_one`` produces the embeddings
+        paths: Unique image paths
+        device: Torch device
+        batch_size: Images per forward pass
+        num_workers: DataLoader worker processes for image decoding
+        cache_path: Optional ``.npz`` file holding embeddings from earlier runs
+        fingerprint: Identifies the model weights the cache was built with
+
+    Returns:
+        np.ndarray: (len(paths), dim) embeddings in the order of ``paths``
+    """
+    cached: Dict[str, np.ndarray] = {}
+    if cache_path is not None and cache_path.exists():
+        data = np.load(cache_path, allow_pickle=False)
+        if str(data['fingerprint']) == fingerprint:
+            cached = dict(zip(data['paths'].tolist(), data['embeddings']))
+
+    missing = [p for p in paths if str(p) not in cached]
+    if missing:
+        loader = DataLoader(
+            ImagePathDataset(missing),
+            batch_size=batch_size,
+            shuffle=False,
+            num_workers=num_workers,
+            pin_memory=device.type == 'cuda'
+        )
+        chunks = []
+        with torch.no_grad():
+            for batch in loader:
+                chunks.append(model.forward_one(batch.to(device, non_blocking=True)).cpu().numpy())
+        cached.update(zip((str(p) for p in missing), np.concatenate(chunks)))
+
+        if cache_path is not None:
+            with open(cache_path, 'wb') as f:
+                np.savez(
+                    f,
+                    fingerprint=np.array(fingerprint),
+                    paths=np.array(list(cached)),
+                    embeddings=np.stack(list(cached.values()))
+                )
+
+    print(f"Embedded {len(missing)} images ({len(paths) - len(missing)} from cache)")
+    return np.stack([cached[str(p)] for p in paths]).astype(np.float32)
+
+def _downsample(curve: np.ndarray, points: int = 200) -> List[float]:
+    idx = np.unique(np.linspace(0, len(curve) - 1, min(points, len(curve))).astype(int))
+    return curve[idx].tolist()
+
+def _binary_metrics(labels: np.ndarray, predictions: np.ndarray) -> dict:
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        labels, predictions, average='binary', zero_division=0
+    )
+    return {
+        'accuracy': float(accuracy_score(labels, predictions)),
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1': float(f1)
+    }
+
+def compute_metrics(labels: np.ndarray, scores: np.ndarray) -> dict:
+    """ROC/PR curves, EER and the best operating threshold for pair similarities."""
+    fpr, tpr, roc_thresholds = roc_curve(labels, scores)
+    precision, recall, pr_thresholds = precision_recall_curve(labels, scores)
+
+    # Equal error rate: where the false accept and false reject rates cross
+    fnr = 1 - tpr
+    eer_idx = int(np.nanargmin(np.abs(fnr - fpr)))
+    # roc_curve's first threshold is +inf (reject everything), which JSON cannot hold
+    eer_threshold = float(roc_thresholds[eer_idx])
+
+    # Best operating threshold by F1 (the last PR point has no threshold)
+    f1 = 2 * precision[:-1] * recall[:-1] / np.maximum(precision[:-1] + recall[:-1], 1e-12)
+    best_idx = int(np.argmax(f1))
+    best_threshold = float(pr_thresholds[best_idx])
+
+    return {
+        'roc_auc': float(roc_auc_score(labels, scores)),
+        'average_precision': float(average_precision_score(labels, scores)),
+        'eer': float((fpr[eer_idx] + fnr[eer_idx]) / 2),
+        'eer_threshold': eer_threshold if np.isfinite(eer_threshold) else None,
+        'best_threshold': best_threshold,
+        'at_best_threshold': _binary_metrics(labels, scores >= best_threshold),
+        'at_0.5': _binary_metrics(labels, scores > 0.5),
+        'curves': {
+            'roc': {'fpr': _downsample(fpr), 'tpr': _downsample(tpr)},
+            'pr': {'precision': _downsample(precision), 'recall': _downsample(recall)}
+        }
+    }
+
+def evaluate_model(model_path: Path, pairs_file: Path, image_root: Path = Path('.'), batch_size: int = 64,
+                   num_workers: int = 4, cache_path: Path = None):
+    """Evaluate a trained model on labelled image pairs.
+
+    Each unique image is embedded once and all pair similarities are computed
+    in a single vectorized operation, so cost grows with the number of unique
+    images rather than the number of pairs.
+
     Args:
         model_path: Path to the saved model
-        test_data_dir: Directory containing test images
-        batch_size: Batch size for evaluation
+        pairs_file: CSV with image1, image2 and label columns
+        image_root: Directory the image paths in the CSV are relative to
+        batch_size: Batch size for embedding
+        num_workers: DataLoader workers for image decoding
+        cache_path: Optional embedding cache file
+
+    Raises:
+        ValueError: If the CSV has no pairs or only one label class
     """
+    start = time.perf_counter()
+    paths, left, right, labels = index_pairs(pairs_file, image_root)
+    index_s = time.perf_counter() - start
+
+    # ROC/PR metrics are undefined without pairs of both classes
+    if len(labels) == 0:
+        raise ValueError(f"No pairs found in {pairs_file}")
+    if len(np.unique(labels)) < 2:
+        raise ValueError(
+            f"{pairs_file} needs both matching (label 1) and non-matching (label 0) pairs, "
+            f"but every pair is labelled {int(labels[0])}"
+        )
+
     # Set device
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    
+
     # Load model
     model = SiameseNetwork().to(device)
-    model.load_state_dict(torch.load(model_path))
+    model.load_state_dict(torch.load(model_path, map_location=device))
     model.eval()
-    
-    # Create test dataset and loader
-    test_dataset = HandwritingDataset(test_data_dir)
-    test_loader = DataLoader(test_dataset, batch_size=batch_size, shuffle=False)
-    
-    predictions = []
-    labels = []
-    
-    with torch.no_grad():
-        for batch in test_loader:
-            img1, img2, label = batch
-            img1, img2 = img1.to(device), img2.to(device)
-            
-            # Get predictions
-            outputs = model(img1, img2)
-            predictions.extend(outputs.cpu().numpy())
-            labels.extend(label.cpu().numpy())
-    
-    # Calculate metrics
-    accuracy = accuracy_score(labels, predictions > 0.5)
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        labels, predictions > 0.5, average='binary'
+
+    start = time.perf_counter()
+    embeddings = embed_images(
+        model, paths, device, batch_size, num_workers, cache_path, _model_fingerprint(model_path)
     )
-    
-    metrics = {
-        'accuracy': float(accuracy),
-        'precision': float(precision),
-        'recall': float(recall),
-        'f1': float(f1)
+    embed_s = time.perf_counter() - start
+
+    # Cosine similarity of every pair at once, matching SiameseNetwork.forward
+    start = time.perf_counter()
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-8)
+    scores = np.einsum('ij,ij->i', embeddings[left], embeddings[right])
+    score_s = time.perf_counter() - start
+
+    metrics = compute_metrics(labels, scores)
+    metrics['throughput'] = {
+        'pairs': int(len(labels)),
+        'unique_images': len(paths),
+        'index_seconds': index_s,
+        'embed_seconds': embed_s,
+        'images_per_s': len(paths) / embed_s if embed_s else None,
+        'pairs_per_s': len(labels) / score_s if score_s else None
     }
-    
+
     return metrics
 
 def main():
     parser = argparse.ArgumentParser(description="Evaluate trained model")
     parser.add_argument("--model_path", type=str, required=True, help="Path to saved model")
-    parser.add_argument("--test_data", type=str, required=True, help="Directory containing test data")
+    parser.add_argument("--pairs", type=str, default="dataset/pairs.csv", help="CSV of labelled image pairs")
+    parser.add_argument("--image_root", type=str, default=".", help="Directory the CSV image paths are relative to")
+    parser.add_argument("--batch_size", type=int, default=64, help="Batch size for embedding")
+    parser.add_argument("--num_workers", type=int, default=4, help="DataLoader workers for image decoding")
+    parser.add_argument("--cache", type=str, help="Embedding cache file (.npz) reused across runs")
     parser.add_argument("--output", type=str, help="Path to save metrics JSON")
-    
+
     args = parser.parse_args()
-    
-    model_path = Path(args.model_path)
-    test_data_dir = Path(args.test_data)
-    
-    metrics = evaluate_model(model_path, test_data_dir)
-    
+
+    try:
+        metrics = evaluate_model(
+            Path(args.model_path),
+            Path(args.pairs),
+            Path(args.image_root),
+            args.batch_size,
+            args.num_workers,
+            Path(args.cache) if args.cache else None
+        )
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+
     # Print metrics
     print("\nEvaluation Metrics:")
-    for metric, value in metrics.items():
-        print(f"{metric}: {value:.4f}")
-    
+    for metric in ('roc_auc', 'average_precision', 'eer', 'eer_threshold', 'best_threshold'):
+        value = metrics[metric]
+        print(f"{metric}: {value:.4f}" if value is not None else f"{metric}: n/a")
+    for metric, value in metrics['at_best_threshold'].items():
+        print(f"{metric} @ best threshold: {value:.4f}")
+    throughput = metrics['throughput']
+    print(f"\n{throughput['pairs']} pairs over {throughput['unique_images']} unique images")
+    print(f"Embedding: {throughput['images_per_s']:.1f} images/s")
+
     # Save metrics if output path provided
     if args.output:
         output_path = Path(args.output)
@@ -81,4 +268,4 @@ def main():
         print(f"\nMetrics saved to: {output_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()